@@ -0,0 +1,2 @@
+PILLOW_REPO_PATH = r'/tmp/smk/fakepillow'
+GITHUB_REPO = 'python-pillow/Pillow'
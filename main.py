@@ -10,26 +10,131 @@
 from __future__ import annotations
 
 import argparse
+from concurrent.futures import ThreadPoolExecutor
+import hashlib
 import json
+import mmap
 import os
-from typing import Any, Dict, List
+import pickle
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+# 可选加速：orjson / ujson 直接解析 UTF-8 bytes；都不可用时回退标准库 json。
+try:
+    import orjson as _json_backend
+    _HAS_ORJSON = True  # orjson.loads 接受 memoryview，可直接解析 mmap
+except ImportError:
+    _HAS_ORJSON = False
+    try:
+        import ujson as _json_backend  # type: ignore
+    except ImportError:
+        _json_backend = json
+
+# 小文件直接 read()；超过该阈值才走 mmap（映射本身有固定开销）。
+_MMAP_MIN_BYTES = 1 << 20
+
+# 输入缓存格式版本：缓存键只含 (路径, 版本, mtime, size)，不会自动感知代码变化。
+# 修改 _load_commits / _load_json 或其调用的辅助函数、使解析结果的结构/内容改变时，必须手动递增。
+_INPUT_CACHE_VERSION = 1
 
-from src.analysis_core.commit_analyzer import CommitAnalyzer
-from src.analysis_core.issue_analyzer import IssueAnalyzer
-from src.analysis_core.vulnerability_analyzer import VulnerabilityAnalyzer
-from src.visualization.plot_generator import PlotGenerator
-from src.visualization.report_builder import ReportBuilder
+
+def _loads_mmap(f: Any) -> Any:
+    """把已打开的文件 mmap 后交给 orjson 解析，避免 read() 额外复制一份内容。"""
+    if hasattr(os, 'posix_fadvise'):
+        os.posix_fadvise(f.fileno(), 0, 0, os.POSIX_FADV_SEQUENTIAL)
+    with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        view = memoryview(mm)
+        try:
+            return _json_backend.loads(view)
+        finally:
+            # mmap 关闭前必须释放导出的 buffer
+            view.release()
 
 
 def _load_json(path: str) -> List[Dict[str, Any]]:
     try:
-        with open(path, 'r', encoding='utf-8') as f:
-            data = json.load(f)
+        with open(path, 'rb') as f:
+            if _HAS_ORJSON and os.fstat(f.fileno()).st_size >= _MMAP_MIN_BYTES:
+                data = _loads_mmap(f)
+            else:
+                data = _json_backend.loads(f.read())
         return data if isinstance(data, list) else []
     except Exception:
         return []
 
 
+def _json_default(obj: Any) -> Any:
+    """两种后端都不认识的对象：numpy 标量/数组等带 tolist() 的值转成原生 Python 值。"""
+    tolist = getattr(obj, 'tolist', None)
+    if callable(tolist):
+        return tolist()
+    raise TypeError(f'Object of type {type(obj).__name__} is not JSON serializable')
+
+
+def _dumps_json(obj: Any, pretty: bool = False) -> bytes:
+    """序列化为 UTF-8 JSON：默认紧凑格式，pretty=True 时缩进 2；有 orjson 时走 C 实现。
+
+    orjson 拒绝的输入（如超出 64 位的整数）回退到标准库 json，不因后端差异丢掉整份结果。
+    注意 orjson 把 NaN/Infinity 写成 null，标准库写成 NaN/Infinity。
+    """
+    if _HAS_ORJSON:
+        option = _json_backend.OPT_NON_STR_KEYS | _json_backend.OPT_SERIALIZE_NUMPY
+        if pretty:
+            option |= _json_backend.OPT_INDENT_2
+        try:
+            return _json_backend.dumps(obj, default=_json_default, option=option)
+        except TypeError:
+            pass
+    if pretty:
+        return json.dumps(obj, ensure_ascii=False, indent=2, default=_json_default).encode('utf-8')
+    return json.dumps(obj, ensure_ascii=False, separators=(',', ':'), default=_json_default).encode('utf-8')
+
+
+def _load_commits(path: str) -> Tuple[List[Dict[str, Any]], Dict[str, Dict[str, Any]]]:
+    """读取 commits 列表（走 _load_json 的 orjson/mmap 路径），并在同一遍循环里建立 hash -> commit 索引。"""
+    commits = _load_json(path)
+    commit_index: Dict[str, Dict[str, Any]] = {}
+    for c in commits:
+        if isinstance(c, dict) and c.get('hash'):
+            commit_index[c['hash']] = c
+    return commits, commit_index
+
+
+def _load_cached(path: str, loader: Callable[[str], Any], cache_dir: Optional[str]) -> Any:
+    """以 (path, _INPUT_CACHE_VERSION, mtime, size) 为键的 pickle 旁路缓存：输入文件未变化时跳过 JSON 解析。
+
+    输入文件一旦被重写（mtime/size 变化）键自然失效；loader 改动需手动递增 _INPUT_CACHE_VERSION。
+    同一输入的旧缓存在写新缓存时清理。
+    """
+    if not cache_dir:
+        return loader(path)
+    try:
+        st = os.stat(path)
+    except OSError:
+        return loader(path)
+
+    prefix = hashlib.sha1(os.path.abspath(path).encode('utf-8')).hexdigest()[:16]
+    cache_file = os.path.join(cache_dir, f'{prefix}.v{_INPUT_CACHE_VERSION}.{st.st_mtime_ns}.{st.st_size}.pkl')
+    try:
+        with open(cache_file, 'rb') as f:
+            return pickle.load(f)
+    except Exception:
+        pass
+
+    data = loader(path)
+    try:
+        os.makedirs(cache_dir, exist_ok=True)
+        for name in os.listdir(cache_dir):
+            if name.startswith(prefix + '.'):
+                os.remove(os.path.join(cache_dir, name))
+        tmp = cache_file + '.tmp'
+        with open(tmp, 'wb') as f:
+            pickle.dump(data, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp, cache_file)
+    except Exception as e:
+        print('[main][WARN] failed to write input cache:', e)
+    return data
+
+
 def main() -> int:
     parser = argparse.ArgumentParser(description='Pillow analysis: read processed data, generate charts and report.')
     base = os.path.abspath(os.path.dirname(__file__))
@@ -44,6 +149,9 @@ def main() -> int:
     parser.add_argument('--charts-dir', default=os.path.join(base, 'outputs', 'charts'))
     parser.add_argument('--report', default=os.path.join(base, 'outputs', 'reports', 'pillow_report.md'))
     parser.add_argument('--analysis-json', default=os.path.join(base, 'outputs', 'analysis_results.json'), help='Write full analysis_results to JSON for reuse')
+    parser.add_argument('--pretty-analysis-json', action='store_true', help='Indent --analysis-json for reading (default: compact)')
+    parser.add_argument('--cache-dir', default=os.path.join(base, 'outputs', '.cache'), help='Pickle cache of parsed input JSON (keyed by path/mtime/size and a format version)')
+    parser.add_argument('--no-input-cache', action='store_true', help='Always re-parse input JSON; do not read/write --cache-dir')
 
     # Preflight self-check (enabled by default)
     parser.add_argument('--skip-self-check', action='store_true', help='Skip self_check preflight')
@@ -68,22 +176,32 @@ def main() -> int:
             print('[main][ERROR] self check reported problems; aborting analysis.')
             return 2
 
-    commits = _load_json(args.commits_json)
-    cves = _load_json(args.cves_json)
-    bugs = _load_json(args.bugs_json)
+    # 三个输入互相独立：并行读取/解码（文件 I/O 与 orjson 解析期间会释放 GIL）
+    cache_dir = None if args.no_input_cache else args.cache_dir
+    with ThreadPoolExecutor(max_workers=3) as ex:
+        f_commits = ex.submit(_load_cached, args.commits_json, _load_commits, cache_dir)
+        f_cves = ex.submit(_load_cached, args.cves_json, _load_json, cache_dir)
+        f_bugs = ex.submit(_load_cached, args.bugs_json, _load_json, cache_dir)
+        commits, commit_index = f_commits.result()
+        cves = f_cves.result()
+        bugs = f_bugs.result()
 
     if not commits:
         print('[main][ERROR] commits data not found. Run tools/run_crawl_commits.py first.')
         print('Expected:', args.commits_json)
         return 2
 
-    commit_index = {c.get('hash'): c for c in commits if isinstance(c, dict) and c.get('hash')}
+    # 分析/绘图模块会拉起 pandas / matplotlib：延迟到确实需要时再导入（--help 等路径不付这笔开销）
+    from src.analysis_core.commit_analyzer import CommitAnalyzer
+    from src.analysis_core.issue_analyzer import IssueAnalyzer
 
     commit_stats = CommitAnalyzer().analyze(commits)
     issue_stats = IssueAnalyzer().analyze(bugs)
 
     vuln_stats = None
     if cves:
+        from src.analysis_core.vulnerability_analyzer import VulnerabilityAnalyzer
+
         vuln_stats = VulnerabilityAnalyzer().analyze(cves, commit_index=commit_index)
     else:
         print('[main][WARN] CVE json not found/empty, skipping vulnerability analysis:', args.cves_json)
@@ -97,24 +215,18 @@ def main() -> int:
     # Persist analysis results for downstream tools (e.g., ast_visualizer)
     try:
         os.makedirs(os.path.dirname(args.analysis_json), exist_ok=True)
-        with open(args.analysis_json, 'w', encoding='utf-8') as f:
-            json.dump(analysis_results, f, ensure_ascii=False, indent=2)
+        with open(args.analysis_json, 'wb') as f:
+            f.write(_dumps_json(analysis_results, pretty=bool(args.pretty_analysis_json)))
         print('[main] analysis_json:', args.analysis_json)
     except Exception as e:
         print('[main][WARN] failed to write analysis json:', e)
 
+    from src.visualization.plot_generator import PlotGenerator
+    from src.visualization.report_builder import ReportBuilder
+
     charts = PlotGenerator().generate(analysis_results, out_dir=args.charts_dir)
     report_path = ReportBuilder().build(analysis_results, charts=charts, out_path=args.report)
 
-    # Also persist the aggregated analysis results for downstream tooling (e.g., ast_visualizer).
-    try:
-        analysis_json_path = os.path.join(os.path.dirname(report_path), 'analysis_results.json')
-        with open(analysis_json_path, 'w', encoding='utf-8') as f:
-            json.dump(analysis_results, f, ensure_ascii=False, indent=2)
-        print('[main] analysis_results:', analysis_json_path)
-    except Exception as e:
-        print('[main][WARN] failed to write analysis_results.json:', e)
-
     print('[main] charts_dir:', args.charts_dir)
     print('[main] report:', report_path)
     return 0
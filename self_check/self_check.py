@@ -17,16 +17,43 @@
 from __future__ import annotations
 
 import argparse
+import ast
+import errno
+import functools
+import importlib.machinery
+import importlib.util
+import itertools
 import json
 import os
 import platform
 import re
+import shutil
 import subprocess
 import sys
 import textwrap
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
 from dataclasses import dataclass
 from pathlib import Path
-from typing import Any, Dict, List, Optional, Tuple
+from typing import Any, Dict, FrozenSet, List, Optional, Tuple
+
+try:
+    # 可选：orjson 解析大 JSON（data/processed、analysis_results）更快；未安装时用标准库 json
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    # 可选：ijson 流式读取 commits 样本，内存占用与文件大小无关
+    import ijson
+except ImportError:
+    ijson = None
+
+try:
+    # 可选：Hyperscan 多模式 DFA，一次扫描同时匹配全部 secret 模式；未安装时回退到 re
+    import hyperscan
+except ImportError:
+    hyperscan = None
 
 # -----------------------------
 # 基础配置与工具函数
@@ -35,6 +62,28 @@ from typing import Any, Dict, List, Optional, Tuple
 # 项目根目录：self_check/self_check.py 的上两级目录
 PROJECT_ROOT = Path(__file__).resolve().parents[1]
 
+# 多个检查共用的项目内路径（只构造一次）
+REQUIREMENTS_TXT = PROJECT_ROOT / "requirements.txt"
+LOCAL_SETTINGS = PROJECT_ROOT / "config" / "local_settings.py"
+LOCAL_SETTINGS_EXAMPLE = PROJECT_ROOT / "config" / "local_settings.py.example"
+PROCESSED_DIR = PROJECT_ROOT / "data" / "processed"
+ANALYSIS_JSON = PROJECT_ROOT / "outputs" / "analysis_results.json"
+CHARTS_DIR = PROJECT_ROOT / "outputs" / "charts"
+REPORTS_DIR = PROJECT_ROOT / "outputs" / "reports"
+REPORT_MD = REPORTS_DIR / "pillow_report.md"
+
+# requirements.txt 每行开头的包名（按 bytes 匹配）
+_PKG_RE = re.compile(rb"\s*([A-Za-z0-9_.-]+)")
+# local_settings.py 中疑似 token/key 的模式（名称 -> 预编译正则，按 bytes 匹配，无需先解码）
+_SECRET_RES = {
+    "github_token": re.compile(rb"\b(ghp_[A-Za-z0-9]{20,}|github_pat_[A-Za-z0-9_]{20,})\b", re.IGNORECASE),
+    "generic_token": re.compile(rb"\b(token|api[_-]?key|secret)\b\s*=\s*['\"][^'\"]{12,}['\"]", re.IGNORECASE),
+}
+# commits 样本中用于判断 numstat 是否全零的字段
+_NUMSTAT_FIELDS = ('insertions', 'deletions', 'files_changed')
+# GITHUB_REPO 格式：owner/repo（配合 fullmatch 使用，无需 ^$ 锚点）
+_REPO_RE = re.compile(r"[A-Za-z0-9_.-]+/[A-Za-z0-9_.-]+")
+
 
 @dataclass
 class CheckResult:
@@ -65,12 +114,25 @@ def _pass(name: str, details: str = "") -> CheckResult:
     return CheckResult(name=name, ok=True, details=details, severity="PASS")
 
 
-def _run_cmd(cmd: List[str], cwd: Optional[Path] = None, timeout: int = 30) -> Tuple[int, str]:
+@functools.lru_cache(maxsize=8)
+def _which(name: str) -> Optional[str]:
+    return shutil.which(name)
+
+
+def _run_cmd(
+    cmd: List[str], cwd: Optional[Path] = None, timeout: int = 30, max_bytes: Optional[int] = 4096
+) -> Tuple[int, str]:
     """
     执行命令行命令并返回 (退出码, 输出文本)
     - 统一合并 stdout/stderr，方便输出给用户排查
     - timeout 防止命令卡死
+    - 以 bytes 读取，只对末尾 max_bytes 字节做一次 UTF-8 解码（调用方本来也只展示尾部）；
+      max_bytes=None 时解码全部输出
     """
+    extra: Dict[str, Any] = {}
+    if os.name == "nt":
+        # Windows：不为控制台子进程分配新窗口
+        extra["creationflags"] = subprocess.CREATE_NO_WINDOW
     try:
         p = subprocess.run(
             cmd,
@@ -78,12 +140,11 @@ def _run_cmd(cmd: List[str], cwd: Optional[Path] = None, timeout: int = 30) -> T
             stdout=subprocess.PIPE,
             stderr=subprocess.STDOUT,
             timeout=timeout,
-            text=True,
-            encoding="utf-8",
-            errors="replace",
             shell=False,
+            **extra,
         )
-        return p.returncode, p.stdout.strip()
+        out = p.stdout if max_bytes is None else p.stdout[-max_bytes:]
+        return p.returncode, out.decode("utf-8", "replace").strip()
     except FileNotFoundError as e:
         # 例如 git 未安装/不在 PATH
         return 127, f"Command not found: {cmd[0]} ({e})"
@@ -93,27 +154,166 @@ def _run_cmd(cmd: List[str], cwd: Optional[Path] = None, timeout: int = 30) -> T
         return 1, f"Failed to run {' '.join(cmd)}: {e}"
 
 
+_GIT_LOCK = threading.Lock()
+
+
+@functools.lru_cache(maxsize=1)
+def _git_ls_files_once() -> Tuple[int, FrozenSet[str], str]:
+    code, out = _run_cmd(["git", "ls-files", "-z"], cwd=PROJECT_ROOT, max_bytes=None)
+    if code != 0:
+        return code, frozenset(), out
+    return code, frozenset(x for x in out.split("\0") if x), ""
+
+
+def _git_tracked_files() -> Tuple[int, FrozenSet[str], str]:
+    """
+    一次 `git ls-files -z` 取得项目内所有被跟踪文件（相对 PROJECT_ROOT 的 posix 路径），
+    供多个检查共用，返回 (退出码, 路径集合, 失败时的输出)。
+    检查项在线程池中并发执行：加锁保证只 spawn 一次 git。
+    """
+    with _GIT_LOCK:
+        return _git_ls_files_once()
+
+
+_ROOT_PREFIX = os.path.normcase(str(PROJECT_ROOT)) + os.sep
+
+
+@functools.lru_cache(maxsize=256)
+def _rel_str(path_str: str) -> str:
+    # 先按字面规范化（.. / 分隔符 / Windows 大小写）比较前缀；不在项目下时再解析符号链接重试一次
+    for cand in (os.path.normpath(path_str), os.path.realpath(path_str)):
+        norm = os.path.normcase(cand)
+        if norm.startswith(_ROOT_PREFIX):
+            return cand[len(_ROOT_PREFIX):]
+        if norm + os.sep == _ROOT_PREFIX:
+            return "."
+    return path_str
+
+
 def _safe_rel(p: Path) -> str:
     """
     尽量把路径显示为相对项目根目录的形式，方便阅读。
     如果无法相对，则返回绝对路径。
+    （规范化后按字符串前缀截取并缓存，避免每次做 Path.relative_to 的路径运算）
+    """
+    return _rel_str(str(p))
+
+
+def _stat(p: Path, stats: Optional[Dict[str, Optional[os.stat_result]]] = None) -> Optional[os.stat_result]:
     """
+    os.stat 的单次运行缓存：同一路径在一次自检中只 stat 一次，不存在时返回 None。
+    stats 为 None 时退化为普通的一次 stat。
+    """
+    key = str(p)
+    if stats is not None and key in stats:
+        return stats[key]
+    try:
+        st: Optional[os.stat_result] = os.stat(key)
+    except (OSError, ValueError):
+        st = None
+    if stats is not None:
+        stats[key] = st
+    return st
+
+
+@functools.lru_cache(maxsize=1)
+def _secret_hs_db() -> Any:
+    """把 _SECRET_RES 编译成 Hyperscan block 数据库（只编译一次）；不可用或编译失败时返回 None。"""
+    if hyperscan is None:
+        return None
     try:
-        return str(p.relative_to(PROJECT_ROOT))
+        db = hyperscan.Database(mode=hyperscan.HS_MODE_BLOCK)
+        n = len(_SECRET_RES)
+        db.compile(
+            expressions=[pat.pattern for pat in _SECRET_RES.values()],
+            ids=list(range(n)),
+            flags=[hyperscan.HS_FLAG_CASELESS | hyperscan.HS_FLAG_SINGLEMATCH] * n,
+        )
+        return db
     except Exception:
-        return str(p)
+        return None
 
 
-def _load_py_settings(py_file: Path) -> Dict[str, Any]:
+def _scan_secrets(data: bytes) -> List[str]:
     """
-    读取 config/local_settings.py 这类 python 配置文件，返回其中变量字典。
-    注意：这里使用 exec 载入，不依赖项目包 import。
+    返回 data 中命中的 secret 模式名（按 _SECRET_RES 的顺序）。
+    有 Hyperscan 时单次线性扫描匹配全部模式，否则逐个 re.search（都直接在 bytes 上匹配）。
+    """
+    db = _secret_hs_db()
+    if db is not None:
+        found = set()
+
+        def _on_match(pid: int, start: int, end: int, flags: int, context: Any) -> None:
+            found.add(pid)
+
+        db.scan(data, match_event_handler=_on_match)
+        return [name for i, name in enumerate(_SECRET_RES) if i in found]
+
+    return [name for name, pat in _SECRET_RES.items() if pat.search(data)]
+
+
+def _literal_settings(tree: ast.Module) -> Optional[Dict[str, Any]]:
+    """
+    若模块顶层只有文档字符串和 `NAME = <字面量>` 形式的赋值，直接用 literal_eval 取值；
+    出现任何其他语句（import、函数调用、条件等）返回 None，交由真正执行模块来处理。
     """
     ns: Dict[str, Any] = {}
-    code = py_file.read_text(encoding="utf-8", errors="replace")
-    exec(compile(code, str(py_file), "exec"), ns, ns)
+    for node in tree.body:
+        if isinstance(node, ast.Expr) and isinstance(node.value, ast.Constant):
+            continue
+        if isinstance(node, ast.Assign) and all(isinstance(t, ast.Name) for t in node.targets):
+            targets = [t.id for t in node.targets]
+        elif isinstance(node, ast.AnnAssign) and isinstance(node.target, ast.Name) and node.value is not None:
+            targets = [node.target.id]
+        else:
+            return None
+        try:
+            value = ast.literal_eval(node.value)
+        except (ValueError, TypeError, SyntaxError, MemoryError, RecursionError):
+            return None
+        for name in targets:
+            ns[name] = value
+    return ns
+
+
+@functools.lru_cache(maxsize=1)
+def _read_bytes_cached(path_str: str, mtime_ns: int, size: int) -> bytes:
+    with open(path_str, "rb") as f:
+        return f.read()
+
+
+def _local_settings_source(
+    py_file: Path, stats: Optional[Dict[str, Optional[os.stat_result]]] = None
+) -> bytes:
+    """
+    读取 local_settings.py 的源码（bytes），按 (路径, mtime, size) 缓存：
+    check_local_settings（解析配置）与 check_local_settings_safety（扫描 secret）共用一次读取。
+    """
+    st = _stat(py_file, stats) or os.stat(py_file)
+    return _read_bytes_cached(str(py_file), st.st_mtime_ns, st.st_size)
+
+
+def _load_py_settings(py_file: Path, source: Optional[bytes] = None) -> Dict[str, Any]:
+    """
+    读取 config/local_settings.py 这类 python 配置文件，返回其中变量字典。
+    注意：常见的纯字面量配置只做 ast 解析 + literal_eval，不执行文件；
+    含动态代码（如 os.getenv）时才按文件路径用 importlib 载入（不依赖项目包 import，
+    也不注册到 sys.modules），与 config/settings.py 运行时看到的值保持一致。
+    """
+    if source is None:
+        source = py_file.read_bytes()
+    tree = ast.parse(source, filename=str(py_file))
+    ns = _literal_settings(tree)
+    if ns is not None:
+        return {k: v for k, v in ns.items() if not k.startswith("__")}
+
+    spec = importlib.util.spec_from_file_location("_self_check_local_settings", str(py_file))
+    if spec is None or spec.loader is None:
+        raise ImportError(f"Cannot load settings from {py_file}")
+    mod = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(mod)
     # 过滤掉 __xxx__ 变量
-    return {k: v for k, v in ns.items() if not k.startswith("__")}
+    return {k: v for k, v in vars(mod).items() if not k.startswith("__")}
 
 
 def _mkdir_and_test_write(dir_path: Path) -> Tuple[bool, str]:
@@ -123,6 +323,8 @@ def _mkdir_and_test_write(dir_path: Path) -> Tuple[bool, str]:
     """
     try:
         dir_path.mkdir(parents=True, exist_ok=True)
+        if _try_tmpfile(dir_path):
+            return True, f"Writable: {_safe_rel(dir_path)}"
         test_file = dir_path / ".write_test.tmp"
         test_file.write_text("ok", encoding="utf-8")
         test_file.unlink(missing_ok=True)
@@ -131,39 +333,77 @@ def _mkdir_and_test_write(dir_path: Path) -> Tuple[bool, str]:
         return False, f"Not writable: {_safe_rel(dir_path)} ({e})"
 
 
-def _parse_requirements(req_file: Path) -> List[str]:
+def _try_tmpfile(dir_path: Path) -> bool:
     """
-    解析 requirements.txt 里的包名（best-effort）
-    - 跳过空行/注释
-    - 跳过 -r / -e / -- 这类特殊指令
-    - 提取每行开头的包名
+    Linux 快速路径：用 O_TMPFILE 在目录里创建匿名文件再关闭，不产生目录项、也无需 unlink。
+    平台/文件系统不支持时返回 False，由调用方退回“写临时文件再删除”；权限错误照常抛出。
     """
+    flag = getattr(os, "O_TMPFILE", 0)
+    if not flag:
+        return False
+    try:
+        fd = os.open(str(dir_path), os.O_WRONLY | flag, 0o600)
+    except OSError as e:
+        if e.errno in (errno.EOPNOTSUPP, errno.EISDIR, errno.EINVAL):
+            return False
+        raise
+    os.close(fd)
+    return True
+
+
+@functools.lru_cache(maxsize=8)
+def _parse_requirements_cached(req_path: str, mtime_ns: int) -> Tuple[str, ...]:
+    """按 (路径, mtime) 缓存的 requirements 解析结果；文件被修改后键自然失效。"""
     pkgs: List[str] = []
-    if not req_file.exists():
-        return pkgs
-    for line in req_file.read_text(encoding="utf-8", errors="replace").splitlines():
+    # 直接按 bytes 扫描：包名只含 ASCII，只需解码命中的那一段
+    for line in Path(req_path).read_bytes().splitlines():
         line = line.strip()
-        if not line or line.startswith("#"):
-            continue
-        # requirements 的特殊指令（-r other.txt / -e git+... / --find-links ...）
-        if line.startswith(("-", "--")):
+        # 空行/注释，以及 requirements 的特殊指令（-r other.txt / -e git+... / --find-links ...）
+        if not line or line[:1] in (b"#", b"-"):
             continue
         # 提取包名（允许 pep508 extras）
-        m = re.match(r"^\s*([A-Za-z0-9_.-]+)", line)
+        m = _PKG_RE.match(line)
         if m:
-            pkgs.append(m.group(1))
-    return pkgs
+            pkgs.append(m.group(1).decode("ascii"))
+    return tuple(pkgs)
+
+
+def _parse_requirements(req_file: Path, stats: Optional[Dict[str, Optional[os.stat_result]]] = None) -> List[str]:
+    """
+    解析 requirements.txt 里的包名（best-effort）
+    - 跳过空行/注释
+    - 跳过 -r / -e / -- 这类特殊指令
+    - 提取每行开头的包名
+    """
+    st = _stat(req_file, stats)
+    if st is None:
+        return []
+    return list(_parse_requirements_cached(str(req_file), st.st_mtime_ns))
 
 
 def _check_import(pkg: str) -> Tuple[bool, str]:
     """
-    通过 import 来验证依赖是否安装/可用
+    通过 importlib.util.find_spec 验证依赖是否已安装（只定位 loader，不执行包的顶层代码）
     """
     try:
-        __import__(pkg)
-        return True, f"import {pkg} OK"
+        if "." in pkg:
+            # importlib.util.find_spec 遇到点号名会先 import 父包（执行其 __init__）；
+            # 这里逐级用 PathFinder 沿 submodule_search_locations 定位，全程不执行代码
+            spec = None
+            path: Optional[List[str]] = None
+            parts = pkg.split(".")
+            for i in range(len(parts)):
+                spec = importlib.machinery.PathFinder.find_spec(".".join(parts[: i + 1]), path)
+                if spec is None:
+                    break
+                path = list(spec.submodule_search_locations or [])
+        else:
+            spec = importlib.util.find_spec(pkg)
     except Exception as e:
-        return False, f"import {pkg} FAILED: {e}"
+        return False, f"find_spec({pkg}) FAILED: {e}"
+    if spec is None:
+        return False, f"find_spec({pkg}) FAILED: not installed"
+    return True, f"find_spec({pkg}) OK"
 
 
 # -----------------------------
@@ -183,7 +423,7 @@ def check_python_version(min_major: int = 3, min_minor: int = 8) -> CheckResult:
     return _fail("Python version", details, fix)
 
 
-def check_project_layout() -> CheckResult:
+def check_project_layout(stats: Optional[Dict[str, Optional[os.stat_result]]] = None) -> CheckResult:
     """
     检查项目关键文件/目录是否存在，防止用户不在正确目录运行或项目结构缺失
     """
@@ -192,9 +432,9 @@ def check_project_layout() -> CheckResult:
         PROJECT_ROOT / "src",
         PROJECT_ROOT / "tools",
         PROJECT_ROOT / "main.py",
-        PROJECT_ROOT / "requirements.txt",
+        REQUIREMENTS_TXT,
     ]
-    missing = [p for p in must_exist if not p.exists()]
+    missing = [p for p in must_exist if _stat(p, stats) is None]
     ok = len(missing) == 0
     details = "OK" if ok else "Missing: " + ", ".join(_safe_rel(p) for p in missing)
     fix = "Please ensure you're running self_check inside the repository root, and files are not deleted."
@@ -203,7 +443,9 @@ def check_project_layout() -> CheckResult:
     return _fail("Project layout", details, fix)
 
 
-def check_local_settings() -> Tuple[CheckResult, Dict[str, Any]]:
+def check_local_settings(
+    stats: Optional[Dict[str, Optional[os.stat_result]]] = None,
+) -> Tuple[CheckResult, Dict[str, Any]]:
     """
     检查 config/local_settings.py 是否存在并包含关键字段
     README 通常要求：
@@ -212,10 +454,10 @@ def check_local_settings() -> Tuple[CheckResult, Dict[str, Any]]:
         PILLOW_REPO_PATH
         GITHUB_REPO
     """
-    example = PROJECT_ROOT / "config" / "local_settings.py.example"
-    local = PROJECT_ROOT / "config" / "local_settings.py"
+    example = LOCAL_SETTINGS_EXAMPLE
+    local = LOCAL_SETTINGS
 
-    if not example.exists():
+    if _stat(example, stats) is None:
         # 模板缺失：属于异常情况（不一定致命，但很可疑）
         return (
             _fail(
@@ -226,7 +468,7 @@ def check_local_settings() -> Tuple[CheckResult, Dict[str, Any]]:
             {},
         )
 
-    if not local.exists():
+    if _stat(local, stats) is None:
         # local_settings 未创建：给出清晰的“怎么修”
         fix = textwrap.dedent(
             f"""\
@@ -240,9 +482,9 @@ def check_local_settings() -> Tuple[CheckResult, Dict[str, Any]]:
         return (_fail("config/local_settings.py", "Not found", fix), {})
 
     try:
-        cfg = _load_py_settings(local)
+        cfg = _load_py_settings(local, _local_settings_source(local, stats))
     except Exception as e:
-        # 配置文件语法错误时，exec 会失败
+        # 配置文件语法错误时，载入会失败
         return (
             _fail(
                 "config/local_settings.py",
@@ -266,7 +508,9 @@ def check_local_settings() -> Tuple[CheckResult, Dict[str, Any]]:
     return (_fail("config/local_settings.py keys", details, fix), cfg)
 
 
-def check_pillow_repo_path(cfg: Dict[str, Any]) -> CheckResult:
+def check_pillow_repo_path(
+    cfg: Dict[str, Any], stats: Optional[Dict[str, Optional[os.stat_result]]] = None
+) -> CheckResult:
     """
     检查 PILLOW_REPO_PATH 配置：
     - 是否填写
@@ -282,15 +526,16 @@ def check_pillow_repo_path(cfg: Dict[str, Any]) -> CheckResult:
         )
 
     repo_path = Path(str(p)).expanduser()
-    if not repo_path.exists():
+    git_dir = repo_path / ".git"
+    # 常见情况下 .git 存在即可说明目录本身存在：只有 .git 缺失时才再 stat 一次仓库目录
+    ok = _stat(git_dir, stats) is not None
+    if not ok and _stat(repo_path, stats) is None:
         return _fail(
             "PILLOW_REPO_PATH",
             f"Path not found: {repo_path}",
             "Ensure the path exists and points to your local Pillow repo clone.",
         )
 
-    git_dir = repo_path / ".git"
-    ok = git_dir.exists()
     details = f"Found: {repo_path}" + (" (looks like a git repo)" if ok else " (missing .git)")
     fix = "PILLOW_REPO_PATH should point to a git clone of Pillow (directory containing .git)." if not ok else ""
     if ok:
@@ -306,9 +551,9 @@ def check_outputs_dirs() -> List[CheckResult]:
     - outputs/reports
     """
     targets = [
-        PROJECT_ROOT / "data" / "processed",
-        PROJECT_ROOT / "outputs" / "charts",
-        PROJECT_ROOT / "outputs" / "reports",
+        PROCESSED_DIR,
+        CHARTS_DIR,
+        REPORTS_DIR,
     ]
     results: List[CheckResult] = []
     for d in targets:
@@ -325,13 +570,13 @@ def check_outputs_dirs() -> List[CheckResult]:
     return results
 
 
-def check_requirements_imports() -> List[CheckResult]:
+def check_requirements_imports(stats: Optional[Dict[str, Optional[os.stat_result]]] = None) -> List[CheckResult]:
     """
-    根据 requirements.txt 逐个尝试 import，判断依赖是否安装齐全。
+    根据 requirements.txt 逐个探测（find_spec，不实际 import），判断依赖是否安装齐全。
     注意：包名与 import 名可能不同，因此做了少量 alias 映射（best-effort）。
     """
-    req_file = PROJECT_ROOT / "requirements.txt"
-    pkgs = _parse_requirements(req_file)
+    req_file = REQUIREMENTS_TXT
+    pkgs = _parse_requirements(req_file, stats)
     if not pkgs:
         return [_fail("requirements.txt", "No requirements parsed", "Check requirements.txt format/existence.")]
 
@@ -347,9 +592,13 @@ def check_requirements_imports() -> List[CheckResult]:
     all_ok = True
     missing: List[str] = []
 
-    for pkg in pkgs:
-        imp = alias.get(pkg, pkg)
-        ok, msg = _check_import(imp)
+    # find_spec 探测只需微秒级：按 requirements 顺序串行执行（线程池的调度开销反而更大）；
+    # 多个安装名映射到同一 import 名时只探测一次
+    modules = [alias.get(p, p) for p in pkgs]
+    probed = {m: _check_import(m) for m in dict.fromkeys(modules)}
+    outcomes = [probed[m] for m in modules]
+
+    for pkg, (ok, msg) in zip(pkgs, outcomes):
         all_ok = all_ok and ok
         if not ok:
             missing.append(pkg)
@@ -383,28 +632,28 @@ def check_git_available() -> CheckResult:
     """
     检查 git 是否可用（很多分析/对比仓库任务会用到 git）
     """
-    code, out = _run_cmd(["git", "--version"], cwd=PROJECT_ROOT)
-    ok = code == 0
-    fix = "Install Git and ensure 'git' is on PATH." if not ok else ""
-    if ok:
-        return _pass("Git availability", out or "git OK")
-    return _fail("Git availability", out or "git --version failed", fix)
+    # 只需确认 PATH 上能找到 git，不必为此启动子进程；真正的 git 调用
+    # （如 local_settings 跟踪检查的 ls-files）失败时会各自报告
+    exe = _which("git")
+    if exe:
+        return _pass("Git availability", f"git found: {exe}")
+    return _fail("Git availability", "git not found on PATH", "Install Git and ensure 'git' is on PATH.")
 
 
-def check_local_settings_safety() -> List[CheckResult]:
+def check_local_settings_safety(stats: Optional[Dict[str, Optional[os.stat_result]]] = None) -> List[CheckResult]:
     """自检：local_settings 是否安全。
 
     - 如果 config/local_settings.py 被 git 跟踪：FAIL（高风险误提交）
     - 如果文件包含疑似 token/key：WARN（提醒不要外发/不要提交）
     """
     results: List[CheckResult] = []
-    local = PROJECT_ROOT / "config" / "local_settings.py"
-    if not local.exists():
+    local = LOCAL_SETTINGS
+    if _stat(local, stats) is None:
         return results
 
     # 1) tracked by git?
-    code, out = _run_cmd(["git", "ls-files", "--", str(local)], cwd=PROJECT_ROOT)
-    if code == 0 and out.strip():
+    code, tracked, _ = _git_tracked_files()
+    if code == 0 and local.relative_to(PROJECT_ROOT).as_posix() in tracked:
         results.append(
             _fail(
                 "config/local_settings.py tracked",
@@ -419,12 +668,7 @@ def check_local_settings_safety() -> List[CheckResult]:
 
     # 2) token-like patterns
     try:
-        text = local.read_text(encoding="utf-8", errors="replace")
-        patterns = {
-            "github_token": r"\b(ghp_[A-Za-z0-9]{20,}|github_pat_[A-Za-z0-9_]{20,})\b",
-            "generic_token": r"\b(token|api[_-]?key|secret)\b\s*=\s*['\"][^'\"]{12,}['\"]",
-        }
-        hits = [name for name, pat in patterns.items() if re.search(pat, text, flags=re.IGNORECASE)]
+        hits = _scan_secrets(_local_settings_source(local, stats))
         if hits:
             results.append(
                 _warn(
@@ -442,15 +686,15 @@ def check_local_settings_safety() -> List[CheckResult]:
     return results
 
 
-def check_ast_coverage() -> List[CheckResult]:
+def check_ast_coverage(stats: Optional[Dict[str, Optional[os.stat_result]]] = None) -> List[CheckResult]:
     """自检：AST 分析覆盖率与跳过原因（非阻断）。"""
     results: List[CheckResult] = []
-    analysis_json = PROJECT_ROOT / "outputs" / "analysis_results.json"
-    if not analysis_json.exists():
+    analysis_json = ANALYSIS_JSON
+    if _stat(analysis_json, stats) is None:
         return results
 
     try:
-        data = json.loads(analysis_json.read_text(encoding="utf-8", errors="replace"))
+        data = _json_loads(analysis_json.read_bytes())
         commit = data.get('commit') if isinstance(data, dict) else None
         if not isinstance(commit, dict):
             return results
@@ -503,7 +747,16 @@ def check_ast_coverage() -> List[CheckResult]:
     return results
 
 
-def check_artifact_consistency() -> List[CheckResult]:
+def _scan_pngs(dir_path: Path) -> List[os.DirEntry]:
+    """
+    用 os.scandir 列出目录下的 *.png（与 glob('*.png') 一样跳过隐藏文件）。
+    DirEntry 的类型判断来自目录项本身，stat 结果也会缓存在条目上，避免为每个文件再构造 Path 并重复 stat。
+    """
+    with os.scandir(dir_path) as it:
+        return [e for e in it if e.name.endswith(".png") and not e.name.startswith(".") and e.is_file()]
+
+
+def check_artifact_consistency(stats: Optional[Dict[str, Optional[os.stat_result]]] = None) -> List[CheckResult]:
     """自检：主流程产物一致性（非阻断）。
 
     - outputs/analysis_results.json 与 outputs/charts/* 和 outputs/reports/pillow_report.md 的时间顺序
@@ -511,12 +764,15 @@ def check_artifact_consistency() -> List[CheckResult]:
     """
     results: List[CheckResult] = []
 
-    analysis_json = PROJECT_ROOT / "outputs" / "analysis_results.json"
-    report = PROJECT_ROOT / "outputs" / "reports" / "pillow_report.md"
-    charts_dir = PROJECT_ROOT / "outputs" / "charts"
-    alt_analysis = PROJECT_ROOT / "outputs" / "reports" / "analysis_results.json"
+    analysis_json = ANALYSIS_JSON
+    report = REPORT_MD
+    charts_dir = CHARTS_DIR
+    alt_analysis = REPORTS_DIR / "analysis_results.json"
+
+    # 每个规范产物只做一次 os.stat（不存在为 None），后面只比较 mtime
+    a_st, r_st, alt_st = (_stat(p, stats) for p in (analysis_json, report, alt_analysis))
 
-    if alt_analysis.exists():
+    if alt_st is not None:
         results.append(
             _warn(
                 'Duplicate analysis_results.json',
@@ -525,87 +781,100 @@ def check_artifact_consistency() -> List[CheckResult]:
             )
         )
 
-    if not analysis_json.exists():
+    if a_st is None:
         return results
-
-    try:
-        a_mtime = analysis_json.stat().st_mtime
-    except Exception as e:
-        return results + [_warn('Artifact consistency', f"Cannot stat analysis json: {e}")]
+    a_mtime = a_st.st_mtime
 
     # Report should not be older than analysis (main writes analysis then report)
-    if report.exists():
-        try:
-            r_mtime = report.stat().st_mtime
-            if r_mtime + 1 < a_mtime:
+    if r_st is not None:
+        if r_st.st_mtime + 1 < a_mtime:
+            results.append(
+                _warn(
+                    'Artifact consistency',
+                    f"Report appears older than analysis json: {_safe_rel(report)}",
+                    'Re-run: python main.py (ensure you are looking at the latest outputs).',
+                )
+            )
+        else:
+            results.append(_pass('Artifact consistency (report)', 'Report is consistent with analysis json'))
+
+    # At least one chart should be newer than analysis (charts generated after analysis)
+    try:
+        charts = _scan_pngs(charts_dir)
+        if charts:
+            # DirEntry.stat() 结果缓存在条目上
+            newest = max(e.stat().st_mtime for e in charts)
+            if newest + 1 < a_mtime:
                 results.append(
                     _warn(
-                        'Artifact consistency',
-                        f"Report appears older than analysis json: {_safe_rel(report)}",
-                        'Re-run: python main.py (ensure you are looking at the latest outputs).',
+                        'Artifact consistency (charts)',
+                        'Charts appear older than analysis json.',
+                        'Re-run: python main.py; ensure charts are refreshed.',
                     )
                 )
             else:
-                results.append(_pass('Artifact consistency (report)', 'Report is consistent with analysis json'))
-        except Exception as e:
-            results.append(_warn('Artifact consistency (report)', f"Cannot stat report: {e}"))
-
-    # At least one chart should be newer than analysis (charts generated after analysis)
-    if charts_dir.exists():
-        try:
-            charts = list(charts_dir.glob('*.png'))
-            if charts:
-                newest = max((p.stat().st_mtime for p in charts), default=0)
-                if newest + 1 < a_mtime:
-                    results.append(
-                        _warn(
-                            'Artifact consistency (charts)',
-                            'Charts appear older than analysis json.',
-                            'Re-run: python main.py; ensure charts are refreshed.',
-                        )
-                    )
-                else:
-                    results.append(_pass('Artifact consistency (charts)', f"{len(charts)} charts look consistent"))
-        except Exception as e:
-            results.append(_warn('Artifact consistency (charts)', f"Cannot inspect charts: {e}"))
+                results.append(_pass('Artifact consistency (charts)', f"{len(charts)} charts look consistent"))
+    except FileNotFoundError:
+        pass
+    except Exception as e:
+        results.append(_warn('Artifact consistency (charts)', f"Cannot inspect charts: {e}"))
 
     return results
 
 
-def check_network_and_github(cfg: Dict[str, Any], timeout: int = 8) -> List[CheckResult]:
+def _http_session(cfg: Dict[str, Any]) -> Any:
     """
-    可选网络检查：
-    1) 能否访问 GitHub API（https://api.github.com）
-    2) GitHub API rate limit 是否可用（并提示 token 是否生效）
-    3) GITHUB_REPO 格式是否正确（owner/repo）
+    构建网络检查共用的 requests.Session：
+    - 使用 requests 以便代理/CA 配置（HTTP_PROXY/HTTPS_PROXY/CA_BUNDLE）生效
+    - Session 自带连接池（keep-alive），多次探测复用同一 TCP/TLS 连接
     """
-    results: List[CheckResult] = []
-
-    # Use requests so that proxy/CA settings (HTTP_PROXY/HTTPS_PROXY/CA_BUNDLE) take effect.
-    try:
-        import requests
-    except Exception as e:
-        return [_warn("Network checks", f"requests not available, skipping network checks: {e}")]
+    import requests
 
     http_proxy = cfg.get('HTTP_PROXY') or os.getenv('HTTP_PROXY') or ''
     https_proxy = cfg.get('HTTPS_PROXY') or os.getenv('HTTPS_PROXY') or ''
     ca_bundle = cfg.get('CA_BUNDLE') or os.getenv('REQUESTS_CA_BUNDLE') or ''
 
     s = requests.Session()
+    s.headers['User-Agent'] = 'self_check'
     if http_proxy or https_proxy:
         s.proxies.update({k: v for k, v in {'http': http_proxy, 'https': https_proxy}.items() if v})
     if ca_bundle:
         s.verify = ca_bundle
+    return s
+
+
+def check_network_and_github(cfg: Dict[str, Any], timeout: int = 8, session: Optional[Any] = None) -> List[CheckResult]:
+    """
+    可选网络检查：
+    1) 能否访问 GitHub API（https://api.github.com）
+    2) GitHub API rate limit 是否可用（并提示 token 是否生效）
+    3) GITHUB_REPO 格式是否正确（owner/repo）
 
-    # 1) 基础 HTTPS 连通性
+    session: 可传入已有的 requests.Session 以复用连接；默认按 cfg 新建。
+    """
+    results: List[CheckResult] = []
+
+    if session is None:
+        try:
+            session = _http_session(cfg)
+        except Exception as e:
+            return [_warn("Network checks", f"requests not available, skipping network checks: {e}")]
+    s = session
+
+    token = cfg.get("GITHUB_TOKEN")
+    headers = {}
+    if token:
+        headers["Authorization"] = f"token {token}"
+
+    # 1) 基础 HTTPS 连通性：与 rate limit 查询共用同一次请求（带 token 时顺带验证 token）
+    url = 'https://api.github.com/rate_limit'
+    token_rejected = False
     try:
-        r = s.get('https://api.github.com/rate_limit', timeout=timeout, headers={'User-Agent': 'self_check'})
-        ok = (r.status_code == 200)
-        if ok:
-            results.append(_pass('HTTPS to api.github.com', f'status={r.status_code}'))
-        else:
-            results.append(_fail('HTTPS to api.github.com', f'status={r.status_code}', 'Check proxy/CA settings.'))
-            return results
+        r = s.get(url, timeout=timeout, headers=headers)
+        if token and r.status_code == 401:
+            # 只有 token 被拒时才补一次匿名请求：确认端点本身可达，并拿到匿名配额
+            token_rejected = True
+            r = s.get(url, timeout=timeout)
     except Exception as e:
         results.append(
             _fail(
@@ -617,14 +886,15 @@ def check_network_and_github(cfg: Dict[str, Any], timeout: int = 8) -> List[Chec
         )
         return results
 
-    # 2) GitHub API 限额检查（可选 token）
-    token = cfg.get("GITHUB_TOKEN")
-    headers = {"User-Agent": "self_check"}
-    if token:
-        headers["Authorization"] = f"token {token}"
+    ok = r.status_code == 200
+    if ok:
+        results.append(_pass('HTTPS to api.github.com', f'status={r.status_code}'))
+    else:
+        results.append(_fail('HTTPS to api.github.com', f'status={r.status_code}', 'Check proxy/CA settings.'))
+        return results
 
+    # 2) GitHub API 限额检查（可选 token）
     try:
-        r = s.get('https://api.github.com/rate_limit', timeout=timeout, headers=headers)
         data = r.json() if r.headers.get('content-type', '').startswith('application/json') else {}
 
         core = data.get("resources", {}).get("core", {})
@@ -632,9 +902,15 @@ def check_network_and_github(cfg: Dict[str, Any], timeout: int = 8) -> List[Chec
         limit = core.get("limit")
         reset = core.get("reset")
 
-        ok = isinstance(remaining, int) and remaining >= 1
-        details = f"rate_limit core remaining={remaining}/{limit}, reset_epoch={reset}, auth={'yes' if token else 'no'}"
-        fix = "Set GITHUB_TOKEN in config/local_settings.py to increase API quota." if not token else ""
+        ok = isinstance(remaining, int) and remaining >= 1 and not token_rejected
+        auth = 'rejected (401), anonymous quota shown' if token_rejected else ('yes' if token else 'no')
+        details = f"rate_limit core remaining={remaining}/{limit}, reset_epoch={reset}, auth={auth}"
+        if token_rejected:
+            fix = "GITHUB_TOKEN was rejected by GitHub (401 Bad credentials). Check or regenerate the token."
+        elif not token:
+            fix = "Set GITHUB_TOKEN in config/local_settings.py to increase API quota."
+        else:
+            fix = ""
         if ok:
             results.append(_pass('GitHub API rate limit', details))
         else:
@@ -645,7 +921,7 @@ def check_network_and_github(cfg: Dict[str, Any], timeout: int = 8) -> List[Chec
     # 3) 校验 GITHUB_REPO 格式
     repo = cfg.get("GITHUB_REPO")
     if repo:
-        ok = bool(re.match(r"^[A-Za-z0-9_.-]+/[A-Za-z0-9_.-]+$", str(repo)))
+        ok = _REPO_RE.fullmatch(str(repo)) is not None
         if ok:
             results.append(_pass('GITHUB_REPO format', f'GITHUB_REPO={repo}'))
         else:
@@ -679,25 +955,51 @@ def check_tools_check_https() -> CheckResult:
     )
 
 
+def _json_loads(data: bytes) -> Any:
+    """按 bytes 解析 JSON：优先 orjson，否则标准库 json（同样直接接受 UTF-8 bytes）。"""
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
 def _load_json_file(path: Path) -> Tuple[bool, Any, str]:
     try:
-        data = json.loads(path.read_text(encoding='utf-8', errors='replace'))
+        data = _json_loads(path.read_bytes())
         return True, data, ''
     except Exception as e:
         return False, None, str(e)
 
 
-def check_processed_data_sanity() -> List[CheckResult]:
+def _sample_json_array(path: Path, n: int, count_all: bool = False) -> Tuple[List[Any], Optional[int]]:
+    """
+    流式取顶层数组的前 n 项作为样本；解析到第 n 项即停止，耗时与文件总大小无关。
+    总条数：数组不足 n 项时即为样本数；否则仅在 count_all=True 时继续解析全文计数，不然返回 None。
+    顶层不是数组时返回 ([], 0)；需要 ijson。
+    """
+    with path.open("rb") as f:
+        items = ijson.items(f, "item", use_float=True)
+        sample = list(itertools.islice(items, n))
+        if len(sample) < n:
+            return sample, len(sample)
+        if not count_all:
+            return sample, None
+        return sample, len(sample) + sum(1 for _ in items)
+
+
+def check_processed_data_sanity(
+    stats: Optional[Dict[str, Optional[os.stat_result]]] = None, count_commits: bool = False
+) -> List[CheckResult]:
     """Validate current pipeline inputs under data/processed.
 
     - commits_all is required for main.py
     - bugs/cves are optional (warn if missing/empty)
+    - count_commits: with ijson, also parse the whole commits file to report the exact total
     """
     results: List[CheckResult] = []
-    processed = PROJECT_ROOT / 'data' / 'processed'
+    processed = PROCESSED_DIR
 
     commits_path = processed / 'pillow_commits_all.json'
-    if not commits_path.exists():
+    if _stat(commits_path, stats) is None:
         results.append(
             _fail(
                 'Processed commits JSON',
@@ -707,38 +1009,42 @@ def check_processed_data_sanity() -> List[CheckResult]:
         )
         return results
 
-    ok, data, err = _load_json_file(commits_path)
-    if not ok:
-        results.append(_fail('Processed commits JSON', f'Invalid JSON: {err}', 'Re-generate commits JSON.'))
-        return results
-    if not isinstance(data, list) or not data:
-        results.append(_fail('Processed commits JSON', 'Empty or not a list', 'Re-generate commits JSON.'))
-        return results
-
     # Basic schema checks (sample to avoid heavy cost)
-    sample = data[:200] if len(data) > 200 else data
-    missing_hash = sum(1 for c in sample if not isinstance(c, dict) or not c.get('hash'))
-    missing_date = sum(1 for c in sample if not isinstance(c, dict) or not c.get('date'))
-    missing_subject = sum(1 for c in sample if not isinstance(c, dict) or c.get('subject') in (None, ''))
-    if missing_hash or missing_date:
-        results.append(
-            _fail(
-                'Commits schema',
-                f'sample_size={len(sample)} missing_hash={missing_hash} missing_date={missing_date} missing_subject={missing_subject}',
-                'Ensure git crawler outputs hash/date/subject fields correctly.',
-            )
-        )
+    if ijson is not None:
+        # 只解析前 200 条样本；精确总数需显式 count_commits（要解析全文）
+        try:
+            sample, total = _sample_json_array(commits_path, 200, count_all=count_commits)
+        except Exception as e:
+            # ijson 的错误信息带多行定位示意，报告里只保留首行
+            msg = (str(e).splitlines() or [type(e).__name__])[0]
+            results.append(_fail('Processed commits JSON', f'Invalid JSON: {msg}', 'Re-generate commits JSON.'))
+            return results
     else:
-        results.append(_pass('Processed commits JSON', f'commits={len(data)} (sample checked)'))
+        ok, data, err = _load_json_file(commits_path)
+        if not ok:
+            results.append(_fail('Processed commits JSON', f'Invalid JSON: {err}', 'Re-generate commits JSON.'))
+            return results
+        if not isinstance(data, list):
+            data = []
+        sample = data[:200] if len(data) > 200 else data
+        total = len(data)
+    if not sample:
+        results.append(_fail('Processed commits JSON', 'Empty or not a list', 'Re-generate commits JSON.'))
+        return results
 
-    # Numstat sanity: detect the classic "all zeros" bug/regression.
-    numstat_fields = ['insertions', 'deletions', 'files_changed']
-    nonzero = 0
+    # 一次遍历同时统计字段缺失与 numstat 非零条数
+    missing_hash = missing_date = missing_subject = nonzero = 0
     for c in sample:
         if not isinstance(c, dict):
+            missing_hash += 1
+            missing_date += 1
+            missing_subject += 1
             continue
+        missing_hash += not c.get('hash')
+        missing_date += not c.get('date')
+        missing_subject += c.get('subject') in (None, '')
         s = 0
-        for f in numstat_fields:
+        for f in _NUMSTAT_FIELDS:
             v = c.get(f)
             if isinstance(v, int):
                 s += v
@@ -746,6 +1052,25 @@ def check_processed_data_sanity() -> List[CheckResult]:
                 s += int(v)
         if s > 0:
             nonzero += 1
+
+    if missing_hash or missing_date:
+        results.append(
+            _fail(
+                'Commits schema',
+                f'sample_size={len(sample)} missing_hash={missing_hash} missing_date={missing_date} missing_subject={missing_subject}',
+                'Ensure git crawler outputs hash/date/subject fields correctly.',
+            )
+        )
+    else:
+        if total is None:
+            st = _stat(commits_path, stats)
+            size_mb = st.st_size / (1 << 20) if st is not None else 0.0
+            details = f'commits>={len(sample)}, {size_mb:.1f} MB (sample checked; exact total: --count-commits)'
+        else:
+            details = f'commits={total} (sample checked)'
+        results.append(_pass('Processed commits JSON', details))
+
+    # Numstat sanity: detect the classic "all zeros" bug/regression.
     if nonzero == 0:
         results.append(
             _warn(
@@ -759,7 +1084,7 @@ def check_processed_data_sanity() -> List[CheckResult]:
 
     # Optional bugs
     bugs_path = processed / 'pillow_bug_issues.json'
-    if not bugs_path.exists():
+    if _stat(bugs_path, stats) is None:
         results.append(_warn('Processed bug issues JSON', f'Missing: {_safe_rel(bugs_path)}', 'If you need bug metrics, run: python tools\\run_collect_bugs.py --since 2020-01-01'))
     else:
         ok, bugs, err = _load_json_file(bugs_path)
@@ -772,7 +1097,7 @@ def check_processed_data_sanity() -> List[CheckResult]:
 
     # Optional CVEs
     cves_path = processed / 'pillow_cves_with_commits.json'
-    if not cves_path.exists():
+    if _stat(cves_path, stats) is None:
         results.append(_warn('Processed CVE JSON', f'Missing: {_safe_rel(cves_path)}', 'If you need CVE metrics, run: python tools\\run_collect.py ; python tools\\run_link_commits.py'))
     else:
         ok, cves, err = _load_json_file(cves_path)
@@ -795,15 +1120,18 @@ def check_processed_data_sanity() -> List[CheckResult]:
     return results
 
 
-def check_output_artifacts() -> List[CheckResult]:
+def check_output_artifacts(stats: Optional[Dict[str, Optional[os.stat_result]]] = None) -> List[CheckResult]:
     """Non-blocking checks for expected outputs."""
     results: List[CheckResult] = []
-    charts_dir = PROJECT_ROOT / 'outputs' / 'charts'
-    reports_dir = PROJECT_ROOT / 'outputs' / 'reports'
-    report = reports_dir / 'pillow_report.md'
+    charts_dir = CHARTS_DIR
+    report = REPORT_MD
 
-    if charts_dir.exists():
-        pngs = list(charts_dir.glob('*.png'))
+    if _stat(charts_dir, stats) is not None:
+        try:
+            pngs = _scan_pngs(charts_dir)
+        except OSError:
+            # 与 glob 一致：目录不可读时按“没有 PNG”处理
+            pngs = []
         if not pngs:
             results.append(_warn('Charts outputs', f'No PNG found under {_safe_rel(charts_dir)}', 'Run: python main.py'))
         else:
@@ -811,15 +1139,13 @@ def check_output_artifacts() -> List[CheckResult]:
     else:
         results.append(_warn('Charts outputs', f'Missing dir: {_safe_rel(charts_dir)}', 'Run: python main.py'))
 
-    if report.exists():
-        try:
-            size = report.stat().st_size
-            if size <= 50:
-                results.append(_warn('Report output', f'{_safe_rel(report)} too small ({size} bytes)', 'Re-run: python main.py ; check console errors.'))
-            else:
-                results.append(_pass('Report output', f'{_safe_rel(report)} ({size} bytes)'))
-        except Exception as e:
-            results.append(_warn('Report output', f'Cannot stat report: {e}', 'Check filesystem permissions.'))
+    report_st = _stat(report, stats)
+    if report_st is not None:
+        size = report_st.st_size
+        if size <= 50:
+            results.append(_warn('Report output', f'{_safe_rel(report)} too small ({size} bytes)', 'Re-run: python main.py ; check console errors.'))
+        else:
+            results.append(_pass('Report output', f'{_safe_rel(report)} ({size} bytes)'))
     else:
         results.append(_warn('Report output', f'Missing: {_safe_rel(report)}', 'Run: python main.py'))
 
@@ -830,75 +1156,85 @@ def check_output_artifacts() -> List[CheckResult]:
 # 总执行逻辑
 # -----------------------------
 
-def run_all(strict: bool, no_network: bool, run_https_tool: bool) -> int:
+def run_all(strict: bool, no_network: bool, run_https_tool: bool, count_commits: bool = False) -> int:
     """
     运行所有检查项，打印报告，并根据 strict / 核心失败项决定退出码。
     """
     results: List[CheckResult] = []
-
-    # 1) 基础环境类检查
-    results.append(check_python_version())
-    results.append(check_project_layout())
-    results.append(check_git_available())
-
-    # 2) 配置检查（local_settings）
-    local_settings_res, cfg = check_local_settings()
-    results.append(local_settings_res)
-
-    # 2b) local_settings 安全检查（防误提交/泄露）
-    results.extend(check_local_settings_safety())
-
-    # 3) 依赖配置后才能检查 Pillow repo path
-    if cfg:
-        results.append(check_pillow_repo_path(cfg))
-
-    # 4) 输出目录可写
-    results.extend(check_outputs_dirs())
-
-    # 4b) 当前数据口径自检（data/processed）
-    results.extend(check_processed_data_sanity())
-
-    # 5) requirements 依赖是否安装
-    results.extend(check_requirements_imports())
-
-    # 5b) 输出产物检查（不阻断）
-    results.extend(check_output_artifacts())
-
-    # 5c) AST 覆盖率与产物一致性（不阻断）
-    results.extend(check_ast_coverage())
-    results.extend(check_artifact_consistency())
-
-    # 6) 网络相关检查（可关闭）
-    if (not no_network) and cfg:
-        results.extend(check_network_and_github(cfg))
-
-    # 7) 可选运行 tools/check_https.py
-    if run_https_tool:
-        results.append(check_tools_check_https())
+    # 各检查共享的 stat 结果（同一路径一次运行只 stat 一次）。
+    # check_outputs_dirs 会创建 data/、outputs/ 下的目录，它先于所有读取这些路径的检查执行；
+    # 其余检查只读不写
+    stats: Dict[str, Optional[os.stat_result]] = {}
+
+    # 有前后依赖的两项先串行执行：
+    # - Pillow repo / 网络检查需要 local_settings 解析出的 cfg
+    # - 输出目录检查会创建目录，需先于读取产物的检查完成
+    local_settings_res, cfg = check_local_settings(stats)
+    outputs_dirs_res = check_outputs_dirs()
+
+    # 其余检查彼此独立，主要耗时在子进程 / 文件 IO / 网络上：线程池并发执行，
+    # 再按下面列出的顺序收集结果，报告顺序与串行执行时一致
+    with ThreadPoolExecutor(max_workers=8) as ex:
+        steps: List[Any] = [
+            # 1) 基础环境类检查
+            ex.submit(check_python_version),
+            ex.submit(check_project_layout, stats),
+            ex.submit(check_git_available),
+            # 2) 配置检查（local_settings）
+            local_settings_res,
+            # 2b) local_settings 安全检查（防误提交/泄露）
+            ex.submit(check_local_settings_safety, stats),
+            # 3) 依赖配置后才能检查 Pillow repo path
+            ex.submit(check_pillow_repo_path, cfg, stats) if cfg else None,
+            # 4) 输出目录可写
+            outputs_dirs_res,
+            # 4b) 当前数据口径自检（data/processed）
+            ex.submit(check_processed_data_sanity, stats, count_commits),
+            # 5) requirements 依赖是否安装
+            ex.submit(check_requirements_imports, stats),
+            # 5b) 输出产物检查（不阻断）
+            ex.submit(check_output_artifacts, stats),
+            # 5c) AST 覆盖率与产物一致性（不阻断）
+            ex.submit(check_ast_coverage, stats),
+            ex.submit(check_artifact_consistency, stats),
+            # 6) 网络相关检查（可关闭）
+            ex.submit(check_network_and_github, cfg) if (not no_network) and cfg else None,
+            # 7) 可选运行 tools/check_https.py
+            ex.submit(check_tools_check_https) if run_https_tool else None,
+        ]
+        for step in steps:
+            res = step.result() if isinstance(step, Future) else step
+            if res is None:
+                continue
+            results.extend(res if isinstance(res, list) else [res])
 
     # ----------------- 打印报告 -----------------
     ok_count = sum(1 for r in results if r.ok)
     total = len(results)
 
-    print("=" * 72)
-    print("Self Check Report")
-    print(f"Project: {PROJECT_ROOT}")
-    print(f"Platform: {platform.platform()}  |  Python: {sys.version.splitlines()[0]}")
-    print("-" * 72)
+    # 报告先拼进缓冲区，最后一次性写出（stdout 为管道/文件时省去逐行 print 的开销）
+    out: List[str] = [
+        "=" * 72,
+        "Self Check Report",
+        f"Project: {PROJECT_ROOT}",
+        f"Platform: {platform.platform()}  |  Python: {sys.version.splitlines()[0]}",
+        "-" * 72,
+    ]
 
     for r in results:
         status = r.severity if r.severity else ("PASS" if r.ok else "FAIL")
-        print(f"[{status}] {r.name}")
+        out.append(f"[{status}] {r.name}")
         if r.details:
-            print("  -", r.details)
+            out.append(f"  - {r.details}")
         if (not r.ok) and r.fix:
-            for line in r.fix.splitlines():
-                print("  *", line)
-        print()
+            out.extend(f"  * {line}" for line in r.fix.splitlines())
+        out.append("")
 
-    print("-" * 72)
-    print(f"Summary: {ok_count}/{total} checks passed.")
-    print("=" * 72)
+    out.append("-" * 72)
+    out.append(f"Summary: {ok_count}/{total} checks passed.")
+    out.append("=" * 72)
+    sys.stdout.write("\n".join(out) + "\n")
+    sys.stdout.flush()
 
     # strict：只要有失败就返回 1
     if strict and ok_count != total:
@@ -926,8 +1262,14 @@ def main(argv: Optional[List[str]] = None) -> int:
     parser.add_argument("--strict", action="store_true", help="Any failure makes exit code = 1")
     parser.add_argument("--no-network", action="store_true", help="Skip network & GitHub API checks")
     parser.add_argument("--run-check-https", action="store_true", help="Run tools/check_https.py if exists")
+    parser.add_argument("--count-commits", action="store_true", help="Parse the whole commits JSON to report its exact size")
     args = parser.parse_args(argv)
-    return run_all(strict=args.strict, no_network=args.no_network, run_https_tool=args.run_check_https)
+    return run_all(
+        strict=args.strict,
+        no_network=args.no_network,
+        run_https_tool=args.run_check_https,
+        count_commits=args.count_commits,
+    )
 
 
 if __name__ == "__main__":
@@ -4,8 +4,9 @@
 
 约定：提供统一的 `ASTAnalyzer` 类，供 `CommitAnalyzer` 调用：
 
-- analyze(code: str, file_path: str) -> dict
+- analyze(code: str | bytes, file_path: str) -> dict
   返回包含 patterns_found / security_issues_potential 等字段的结果。
+  code 可直接传源码 bytes（如 git cat-file 的输出），由 ast.parse 自行处理 BOM / coding 声明。
 
 说明：本模块仅做“信号级”静态检测（pattern spotting），不做完整数据流/污点分析。
 """
@@ -14,8 +15,19 @@ from __future__ import annotations
 
 import ast
 import os
+import re
+from collections import OrderedDict
 from dataclasses import dataclass
-from typing import Any, Dict, List, Optional
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple, Union
+
+
+# 危险调用的属性名集合（os.* / subprocess.* / pickle.*）
+_OS_DANGEROUS = frozenset({'system', 'popen'})
+_SUBPROC_FUNCS = frozenset({'run', 'call', 'Popen', 'check_call', 'check_output'})
+_PICKLE_FUNCS = frozenset({'load', 'loads'})
+
+# bytes 源码按声明编码解码失败时 SyntaxError.msg 中的特征串（真正的语法错误不含这些）
+_DECODE_ERROR_MARKERS = ("(unicode error)", "codec can't decode", "unknown encoding", "encoding problem")
 
 
 @dataclass(frozen=True)
@@ -27,9 +39,10 @@ class PatternHit:
 class ASTAnalyzer:
     """通用 AST 分析器（标准库 ast）：检测危险模式 + 基础结构指标。"""
 
-    def analyze(self, code: str, file_path: str = "") -> Dict[str, Any]:
+    def analyze(self, code: Union[str, bytes], file_path: str = "") -> Dict[str, Any]:
         file_path = file_path or ""
-        if not isinstance(code, str) or not code.strip():
+        # isspace 判断全空白，不像 strip() 那样复制整份源码
+        if not isinstance(code, (str, bytes)) or not code or code.isspace():
             return {
                 'file_path': file_path,
                 'patterns_found': [],
@@ -43,8 +56,14 @@ class ASTAnalyzer:
             }
 
         try:
-            tree = ast.parse(code, filename=file_path or '<unknown>')
+            # e.msg 不含文件名，空路径直接传给解析器即可
+            tree = ast.parse(code, filename=file_path, type_comments=False)
         except SyntaxError as e:
+            msg = e.msg or ''
+            if isinstance(code, bytes) and any(m in msg for m in _DECODE_ERROR_MARKERS):
+                # bytes 按声明编码解码失败时，按 utf-8 + replace 转成文本再解析一次，
+                # 与以文本方式读取源码时的容错行为一致；真正的语法错误直接返回，不重复解析
+                return self.analyze(code.decode('utf-8', 'replace'), file_path)
             return {
                 'file_path': file_path,
                 'patterns_found': [],
@@ -72,12 +91,14 @@ class ASTAnalyzer:
         visitor = _DangerPatternVisitor()
         visitor.visit(tree)
 
-        hits = visitor.hits
-        patterns_found = [h.pattern for h in hits]
+        patterns_found = visitor.hit_patterns
         return {
             'file_path': file_path,
             'patterns_found': patterns_found,
-            'pattern_hits': [{'pattern': h.pattern, 'lineno': h.lineno} for h in hits],
+            'pattern_hits': [
+                {'pattern': pattern, 'lineno': lineno}
+                for pattern, lineno in zip(patterns_found, visitor.hit_linenos)
+            ],
             'security_issues_potential': int(len(patterns_found)),
             'complexity_score': int(visitor.complexity_score),
             'function_count': int(visitor.function_count),
@@ -87,100 +108,151 @@ class ASTAnalyzer:
         }
 
 
-class _DangerPatternVisitor(ast.NodeVisitor):
-    """检测危险模式的 AST visitor。"""
+def _walk_preorder(tree: ast.AST) -> Iterator[ast.AST]:
+    """前序（深度优先）遍历 AST，节点顺序与 ast.NodeVisitor 一致（ast.walk 是广度优先）。"""
+    iter_children = ast.iter_child_nodes
+    stack = [tree]
+    pop = stack.pop
+    push = stack.extend
+    while stack:
+        node = pop()
+        yield node
+        children = list(iter_children(node))
+        children.reverse()
+        push(children)
+
+
+class _DangerPatternVisitor:
+    """检测危险模式的 AST 遍历器。
+
+    不继承 ast.NodeVisitor：NodeVisitor 对每个节点都要 getattr('visit_' + 类名) 再递归 generic_visit；
+    这里沿 _walk_preorder 做一次前序遍历（节点顺序与 NodeVisitor 相同），按 type(node) 查 _HANDLERS 表分派。
+    """
 
     def __init__(self) -> None:
-        self.hits: List[PatternHit] = []
+        # 命中结果按列存放（两条平行列表），不为每次命中构造 PatternHit 对象
+        self.hit_patterns: List[str] = []
+        self.hit_linenos: List[Optional[int]] = []
         self.function_count = 0
         self.class_count = 0
         self.import_count = 0
         self.complexity_score = 0
 
-    def _lineno(self, node: ast.AST) -> Optional[int]:
-        return int(getattr(node, 'lineno', 0)) or None
+    def visit(self, tree: ast.AST) -> None:
+        handlers = _HANDLERS
+        for node in _walk_preorder(tree):
+            handler = handlers.get(type(node))
+            if handler is not None:
+                handler(self, node)
 
-    def _hit(self, pattern: str, node: ast.AST) -> None:
-        self.hits.append(PatternHit(pattern=pattern, lineno=self._lineno(node)))
+    def _hit(self, pattern: str, node: ast.Call) -> None:
+        # 只对 Call 节点记录命中，Call 一定带 lineno：直接取属性，无需 getattr 兜底
+        self.hit_patterns.append(pattern)
+        self.hit_linenos.append(node.lineno or None)
 
-    def visit_Import(self, node: ast.Import) -> Any:
-        self.import_count += 1
-        return self.generic_visit(node)
+    @property
+    def hits(self) -> List[PatternHit]:
+        """按需组装成 PatternHit 列表（兼容旧接口）。"""
+        return [PatternHit(p, n) for p, n in zip(self.hit_patterns, self.hit_linenos)]
 
-    def visit_ImportFrom(self, node: ast.ImportFrom) -> Any:
+    def _on_import(self, node: ast.AST) -> None:
         self.import_count += 1
-        return self.generic_visit(node)
 
-    def visit_FunctionDef(self, node: ast.FunctionDef) -> Any:
+    def _on_function(self, node: ast.AST) -> None:
         self.function_count += 1
         # complexity heuristic: each function starts with 1
         self.complexity_score += 1
-        return self.generic_visit(node)
 
-    def visit_AsyncFunctionDef(self, node: ast.AsyncFunctionDef) -> Any:
-        self.function_count += 1
-        self.complexity_score += 1
-        return self.generic_visit(node)
-
-    def visit_ClassDef(self, node: ast.ClassDef) -> Any:
+    def _on_class(self, node: ast.ClassDef) -> None:
         self.class_count += 1
-        return self.generic_visit(node)
-
-    def visit_If(self, node: ast.If) -> Any:
-        self.complexity_score += 1
-        return self.generic_visit(node)
-
-    def visit_For(self, node: ast.For) -> Any:
-        self.complexity_score += 1
-        return self.generic_visit(node)
 
-    def visit_While(self, node: ast.While) -> Any:
+    def _on_branch(self, node: ast.AST) -> None:
+        # If / For / While
         self.complexity_score += 1
-        return self.generic_visit(node)
 
-    def visit_Try(self, node: ast.Try) -> Any:
+    def _on_try(self, node: ast.Try) -> None:
         # each except/finally increases complexity
         self.complexity_score += max(1, len(getattr(node, 'handlers', []) or []))
-        return self.generic_visit(node)
 
-    def visit_BoolOp(self, node: ast.BoolOp) -> Any:
+    def _on_boolop(self, node: ast.BoolOp) -> None:
         # a and b and c roughly adds branches
         values = getattr(node, 'values', []) or []
         if len(values) >= 2:
             self.complexity_score += (len(values) - 1)
-        return self.generic_visit(node)
 
-    def visit_Call(self, node: ast.Call) -> Any:
+    def _on_call(self, node: ast.Call) -> None:
+        func = node.func
         # 1) eval()/exec()
-        if isinstance(node.func, ast.Name):
-            if node.func.id == 'eval':
-                self._hit('danger_eval', node)
-            elif node.func.id == 'exec':
-                self._hit('danger_exec', node)
-
-        # 2) os.system / os.popen
-        if isinstance(node.func, ast.Attribute) and isinstance(node.func.value, ast.Name):
-            mod = node.func.value.id
-            attr = node.func.attr
-            if mod == 'os' and attr in {'system', 'popen'}:
-                self._hit(f'danger_os_{attr}', node)
-
-            # 3) subprocess.* with shell=True
-            if mod == 'subprocess' and attr in {'run', 'call', 'Popen', 'check_call', 'check_output'}:
-                for kw in node.keywords or []:
-                    if kw.arg == 'shell' and isinstance(kw.value, ast.Constant) and kw.value.value is True:
-                        self._hit('danger_subprocess_shell_true', node)
-                        break
-
-            # 4) pickle.load / pickle.loads
-            if mod == 'pickle' and attr in {'load', 'loads'}:
-                self._hit(f'danger_pickle_{attr}', node)
-
-            # 5) yaml.load (potentially unsafe loader)
-            if mod == 'yaml' and attr == 'load':
-                self._hit('danger_yaml_load', node)
-
-        return self.generic_visit(node)
+        if isinstance(func, ast.Name):
+            pattern = _NAME_CALL_PATTERNS.get(func.id)
+            if pattern is not None:
+                self._hit(pattern, node)
+            return
+
+        # 2) ~ 5) os.* / subprocess.* / pickle.* / yaml.load：算一次 (模块, 属性) 键后查表分派
+        key = _attr_call_key(func)
+        if key is not None:
+            handler = _ATTR_CALL_HANDLERS.get(key)
+            if handler is not None:
+                handler(self, node)
+
+    def _on_subprocess_call(self, node: ast.Call) -> None:
+        # subprocess.* with shell=True
+        for kw in node.keywords or []:
+            if kw.arg == 'shell' and isinstance(kw.value, ast.Constant) and kw.value.value is True:
+                self._hit('danger_subprocess_shell_true', node)
+                break
+
+
+def _attr_call_key(func: ast.expr) -> Optional[Tuple[str, str]]:
+    """`mod.attr(...)` 形式的调用返回 (mod, attr)，其他形式返回 None。"""
+    if isinstance(func, ast.Attribute) and isinstance(func.value, ast.Name):
+        return func.value.id, func.attr
+    return None
+
+
+def _pattern_hit(pattern: str) -> Callable[[_DangerPatternVisitor, ast.Call], None]:
+    def handler(visitor: _DangerPatternVisitor, node: ast.Call) -> None:
+        visitor._hit(pattern, node)
+    return handler
+
+
+_NAME_CALL_PATTERNS = {'eval': 'danger_eval', 'exec': 'danger_exec'}
+
+# (模块名, 属性名) -> 处理函数
+_ATTR_CALL_HANDLERS: Dict[Tuple[str, str], Callable[[_DangerPatternVisitor, ast.Call], None]] = {
+    **{('os', attr): _pattern_hit(f'danger_os_{attr}') for attr in _OS_DANGEROUS},
+    **{('subprocess', attr): _DangerPatternVisitor._on_subprocess_call for attr in _SUBPROC_FUNCS},
+    **{('pickle', attr): _pattern_hit(f'danger_pickle_{attr}') for attr in _PICKLE_FUNCS},
+    ('yaml', 'load'): _pattern_hit('danger_yaml_load'),
+}
+
+
+# 节点类型 -> 处理函数（精确类型匹配，与 NodeVisitor 按类名分派的语义一致）
+_HANDLERS = {
+    ast.Import: _DangerPatternVisitor._on_import,
+    ast.ImportFrom: _DangerPatternVisitor._on_import,
+    ast.FunctionDef: _DangerPatternVisitor._on_function,
+    ast.AsyncFunctionDef: _DangerPatternVisitor._on_function,
+    ast.ClassDef: _DangerPatternVisitor._on_class,
+    ast.If: _DangerPatternVisitor._on_branch,
+    ast.For: _DangerPatternVisitor._on_branch,
+    ast.While: _DangerPatternVisitor._on_branch,
+    ast.Try: _DangerPatternVisitor._on_try,
+    ast.BoolOp: _DangerPatternVisitor._on_boolop,
+    ast.Call: _DangerPatternVisitor._on_call,
+}
+
+
+# 行号索引条目：(前序位置, lineno, 节点类型名, 函数/类定义名或 None)
+_IndexEntry = Tuple[int, int, str, Optional[str]]
+
+# 函数/类定义节点 -> touched_functions 中的名称前缀
+_DEF_NAME_PREFIXES = {
+    ast.FunctionDef: "",
+    ast.AsyncFunctionDef: "async.",
+    ast.ClassDef: "Class.",
+}
 
 
 class PillowASTAnalyzer:
@@ -190,17 +262,23 @@ class PillowASTAnalyzer:
 并通过 git show 获取指定 commit 的源码版本。
 """
 
-    def __init__(self, pillow_repo_path: str):
+    def __init__(self, pillow_repo_path: str, max_cache_size: int = 256):
         self.repo_path = os.path.abspath(pillow_repo_path)
-        self.ast_cache: Dict[str, ast.AST] = {}
-        self.ignore_patterns = [".c", ".h", "tests/", "docs/", "vendor/"]
+        # LRU：只保留最近用到的 max_cache_size 棵 AST，避免全仓分析时内存无限增长
+        self.ast_cache: "OrderedDict[str, ast.AST]" = OrderedDict()
+        # 每个文件的行号索引（lineno -> 该行节点），与 ast_cache 同样按 LRU 淘汰
+        self.line_index_cache: "OrderedDict[str, Dict[int, List[_IndexEntry]]]" = OrderedDict()
+        self.max_cache_size = max(1, int(max_cache_size))
+        # 非 .py 文件（含 Pillow 变更里占多数的 .c/.h）在 _is_ignored 中按后缀直接排除
+        self.ignore_patterns = ("tests/", "docs/", "vendor/")
+        # 所有忽略子串合成一个正则，一次 search 扫完整条路径
+        self._ignore_re = re.compile("|".join(map(re.escape, self.ignore_patterns)))
 
     def _is_ignored(self, file_path: str) -> bool:
-        """判断文件是否需要忽略"""
-        for pattern in self.ignore_patterns:
-            if pattern in file_path:
-                return True
-        return not file_path.endswith(".py")
+        """判断文件是否需要忽略（先做后缀判断，非 Python 文件直接短路）"""
+        if not file_path.endswith(".py"):
+            return True
+        return self._ignore_re.search(file_path) is not None
 
     def _parse_file(self, file_path: str) -> Optional[ast.AST]:
         """解析单个 Python 文件为 AST（带缓存）"""
@@ -210,18 +288,59 @@ class PillowASTAnalyzer:
         
         # 转为绝对路径
         abs_path = os.path.join(self.repo_path, file_path)
-        if abs_path in self.ast_cache:
-            return self.ast_cache[abs_path]
+        tree = self.ast_cache.get(abs_path)
+        if tree is not None:
+            self.ast_cache.move_to_end(abs_path)
+            return tree
         
         try:
-            with open(abs_path, "r", encoding="utf-8") as f:
+            # 以 bytes 交给 ast.parse：由解析器自行处理 BOM / coding 声明，省去一次文本解码
+            with open(abs_path, "rb") as f:
                 tree = ast.parse(f.read(), filename=abs_path)
                 self.ast_cache[abs_path] = tree
+                while len(self.ast_cache) > self.max_cache_size:
+                    self.ast_cache.popitem(last=False)
                 return tree
         except (SyntaxError, FileNotFoundError, PermissionError, UnicodeDecodeError) as e:
             print(f" 解析文件失败 {abs_path}: {str(e)[:50]}")
             return None
 
+    def _line_index(self, file_path: str) -> Optional[Dict[int, List[_IndexEntry]]]:
+        """构建（并缓存）文件的行号索引：lineno -> [(前序位置, lineno, 节点类型名, 定义名或 None)]。
+
+        整棵树只遍历一次；同一文件被多个 commit / 多段变更行查询时直接查表。
+        """
+        abs_path = os.path.join(self.repo_path, file_path)
+        index = self.line_index_cache.get(abs_path)
+        if index is not None:
+            self.line_index_cache.move_to_end(abs_path)
+            return index
+
+        tree = self._parse_file(file_path)
+        if not tree:
+            return None
+
+        index = {}
+        def_prefixes = _DEF_NAME_PREFIXES
+        for pos, node in enumerate(_walk_preorder(tree)):
+            lineno = getattr(node, "lineno", None)
+            if lineno is None:
+                continue
+            node_cls = type(node)
+            prefix = def_prefixes.get(node_cls)
+            name = None if prefix is None else prefix + node.name
+            entry = (pos, lineno, node_cls.__name__, name)
+            bucket = index.get(lineno)
+            if bucket is None:
+                index[lineno] = [entry]
+            else:
+                bucket.append(entry)
+
+        self.line_index_cache[abs_path] = index
+        while len(self.line_index_cache) > self.max_cache_size:
+            self.line_index_cache.popitem(last=False)
+        return index
+
     def analyze_file_changes(self, file_path: str, line_numbers: List[int]) -> Dict:
         """分析单个文件中指定行的代码变更对应的 AST 特征
         Args:
@@ -241,8 +360,8 @@ class PillowASTAnalyzer:
                 "touched_functions": []
             }
 
-        tree = self._parse_file(file_path)
-        if not tree:
+        index = self._line_index(file_path)
+        if index is None:
             return {
                 "file_path": file_path,
                 "error": "解析失败/非Python文件",
@@ -252,43 +371,41 @@ class PillowASTAnalyzer:
                 "touched_functions": []
             }
         
-        # 自定义访问器：遍历 AST 并匹配行号对应的节点
-        class ChangeAnalyzer(ast.NodeVisitor):
-            def __init__(self, target_lines):
-                self.target_lines = set(target_lines)
-                self.findings = {
-                    "function_defs": [],  # 修改的函数名
-                    "node_types": [],     # 修改的节点类型（如 Assign、If、BinOp）
-                    "lines_matched": []   # 匹配到的行号
-                }
-            
-            def visit(self, node):
-                """重写 visit：检查节点行号是否在目标范围内"""
-                # 获取节点的起始行（ast 节点的 lineno 属性）
-                if hasattr(node, "lineno") and node.lineno in self.target_lines:
-                    self.findings["lines_matched"].append(node.lineno)
-                    self.findings["node_types"].append(type(node).__name__)
-                    # 如果是函数/类定义，记录名称
-                    if isinstance(node, ast.FunctionDef):
-                        self.findings["function_defs"].append(node.name)
-                    elif isinstance(node, ast.AsyncFunctionDef):
-                        self.findings["function_defs"].append(f"async.{node.name}")
-                    elif isinstance(node, ast.ClassDef):
-                        self.findings["function_defs"].append(f"Class.{node.name}")
-                # 继续遍历子节点
-                self.generic_visit(node)
-        
-        analyzer = ChangeAnalyzer(line_numbers)
-        analyzer.visit(tree)
-        
+        # 按变更行号查索引，再按前序位置排序，得到与整树遍历相同的节点顺序
+        entries: List[_IndexEntry] = []
+        for lineno in frozenset(line_numbers):
+            hits = index.get(lineno)
+            if hits:
+                entries.extend(hits)
+        entries.sort()
+
+        findings: Dict[str, List[Any]] = {
+            "function_defs": [],  # 修改的函数名
+            "node_types": [],     # 修改的节点类型（如 Assign、If、BinOp）
+            "lines_matched": []   # 匹配到的行号
+        }
+        function_defs = findings["function_defs"]
+        node_types = findings["node_types"]
+        lines_matched = findings["lines_matched"]
+        unique_types: set = set()
+        unique_funcs: set = set()
+        for _, lineno, node_type, name in entries:
+            lines_matched.append(lineno)
+            node_types.append(node_type)
+            unique_types.add(node_type)
+            # 如果是函数/类定义，记录名称
+            if name is not None:
+                function_defs.append(name)
+                unique_funcs.add(name)
+
         # 去重 + 整理结果
         return {
             "file_path": file_path,
             "total_changed_lines": len(line_numbers),
-            "matched_lines": len(analyzer.findings["lines_matched"]),
-            "unique_node_types": list(set(analyzer.findings["node_types"])),
-            "touched_functions": list(set(analyzer.findings["function_defs"])),
-            "raw_findings": analyzer.findings,
+            "matched_lines": len(lines_matched),
+            "unique_node_types": list(unique_types),
+            "touched_functions": list(unique_funcs),
+            "raw_findings": findings,
             "error": None
         }
 
@@ -323,3 +440,4 @@ class PillowASTAnalyzer:
     def clear_cache(self):
         """清空 AST 缓存（避免内存占用过高）"""
         self.ast_cache.clear()
+        self.line_index_cache.clear()
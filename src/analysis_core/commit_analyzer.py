@@ -6,14 +6,15 @@
 
 from __future__ import annotations
 
-from collections import Counter
+from collections import Counter, defaultdict
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+import functools
 import math
 import os
 import re
 import subprocess
-from typing import Any, Dict, List, Optional, Tuple
-
-import pandas as pd
+from typing import Any, Dict, List, Optional, Tuple, Union
 
 # 导入AST分析器
 try:
@@ -22,6 +23,158 @@ except ImportError:
     ASTAnalyzer = None
 
 
+# fix/security 关键词（analyze 的 is_fix 分类与 AST 分析的候选筛选共用，模块加载时编译一次）
+# 非捕获分组：str.contains 对带捕获组的正则会发 UserWarning
+_FIX_RE = re.compile(
+    r"(?:\bcve-\d{4}-\d+\b|\bsecurity\b|\bfix(?:e[ds])?\b|\bbug(?:s)?\b|\bdefect(?:s)?\b|\bregress(?:ion|ed)?\b|\bcrash(?:es|ed)?\b|\bhot\s*fix\b|\bpatch\b|\bresolve[sd]?\b|\bcloses?\b)",
+    re.IGNORECASE,
+)
+
+
+# CommitAnalyzer.analyze 实际用到的输入字段
+_COMMIT_COLUMNS = ['hash', 'date', 'subject', 'author_name', 'files', 'files_changed', 'insertions', 'deletions']
+
+
+class _GitBlobReader:
+    """常驻的 `git cat-file --batch` 进程：按 `<rev>:<path>` 逐个读取 blob 内容。
+
+    整个分析过程只 fork 一次 git；每次请求写一行、读回一个 "<oid> <type> <size>" 头和正文。
+    对象不存在或进程异常时 read 返回 None，由调用方按读取失败计数。
+    """
+
+    def __init__(self, repo_path: str):
+        self.repo_path = repo_path
+        self._proc: Optional[subprocess.Popen] = None
+
+    def __enter__(self) -> "_GitBlobReader":
+        return self
+
+    def __exit__(self, *exc: Any) -> None:
+        self.close()
+
+    def read(self, spec: str) -> Optional[bytes]:
+        try:
+            proc = self._proc
+            if proc is None:
+                proc = self._proc = subprocess.Popen(
+                    ['git', 'cat-file', '--batch'],
+                    cwd=self.repo_path,
+                    stdin=subprocess.PIPE,
+                    stdout=subprocess.PIPE,
+                    stderr=subprocess.DEVNULL,
+                )
+            proc.stdin.write(spec.encode('utf-8') + b'\n')
+            proc.stdin.flush()
+            header = proc.stdout.readline().split()
+            # "<spec> missing" / "<spec> ambiguous" 等：没有正文
+            if len(header) != 3 or not header[2].isdigit():
+                return None
+            data = proc.stdout.read(int(header[2]))
+            proc.stdout.read(1)  # 正文后的换行
+            return data
+        except (OSError, ValueError):
+            self.close()
+            return None
+
+    def close(self) -> None:
+        proc, self._proc = self._proc, None
+        if proc is None:
+            return
+        try:
+            proc.stdin.close()
+            proc.wait(timeout=5)
+        except Exception:
+            proc.kill()
+            proc.wait()
+        finally:
+            proc.stdout.close()
+
+
+def _run_git(repo_path: str, args: List[str]) -> Tuple[int, str, str]:
+    try:
+        p = subprocess.run(
+            ['git', *args],
+            cwd=repo_path,
+            text=True,
+            encoding='utf-8',
+            errors='replace',
+            capture_output=True,
+        )
+        return int(p.returncode), p.stdout or '', p.stderr or ''
+    except FileNotFoundError:
+        return 127, '', 'git_not_found'
+
+
+@functools.lru_cache(maxsize=4096)
+def _is_python_file(path: str) -> bool:
+    # 同一路径会被大量 commit 反复判断：按路径缓存结果，省去重复的 replace/lower/子串扫描
+    # 先只看末尾 3 个字符判断后缀：非 .py 路径（Pillow 里大量 .c/.h）不必整串转小写
+    if not path or path[-3:].lower() != '.py':
+        return False
+    lowered = path.replace('\\', '/').lower()
+    # Speed: skip tests/docs/vendor-like paths by default
+    if lowered.startswith(('tests/', 'docs/')) or '/tests/' in lowered or '/docs/' in lowered:
+        return False
+    return True
+
+
+def _get_file_at_commit(blob_reader: _GitBlobReader, commit_hash: str, path: str) -> Optional[Union[str, bytes]]:
+    # 常规路径走常驻的 git cat-file --batch；含换行的路径无法放进 batch 协议，退回 git show
+    # batch 读到的原始 bytes 直接交给 ASTAnalyzer（ast.parse 接受 bytes），省去一次解码
+    if '\n' not in path:
+        return blob_reader.read(f'{commit_hash}:{path}')
+    rc, out, _ = _run_git(blob_reader.repo_path, ['show', f'{commit_hash}:{path}'])
+    if rc != 0:
+        return None
+    return out
+
+
+def _analyze_commit_files(
+    blob_reader: _GitBlobReader, analyzer: Any, commit_hash: str, py_files: List[str]
+) -> Dict[str, Any]:
+    """读取并分析单个 commit 的 .py 文件，返回该 commit 的计数（串行路径与进程池 worker 共用）。"""
+    res: Dict[str, Any] = {
+        'files': 0,
+        'errors': 0,
+        'patterns': [],
+        'patterns_total': 0,
+        'complexity': 0,
+        'functions': 0,
+    }
+    for path in py_files:
+        code = _get_file_at_commit(blob_reader, commit_hash, path)
+        if code is None:
+            res['errors'] += 1
+            continue
+
+        res['files'] += 1
+        r = analyzer.analyze(code, file_path=path)
+        if r.get('error'):
+            res['errors'] += 1
+            continue
+
+        res['patterns'].extend(r.get('patterns_found') or [])
+        res['patterns_total'] += int(r.get('security_issues_potential') or 0)
+        res['complexity'] += int(r.get('complexity_score') or 0)
+        res['functions'] += int(r.get('function_count') or 0)
+    return res
+
+
+# 进程池 worker 内的常驻对象：每个 worker 一个 git cat-file 进程 + 一个 ASTAnalyzer
+_worker_state: Dict[str, Any] = {}
+
+
+def _init_ast_worker(repo_path: str) -> None:
+    # worker 退出时其 stdin 管道随之关闭，cat-file 读到 EOF 自行退出
+    _worker_state['blob_reader'] = _GitBlobReader(repo_path)
+    _worker_state['analyzer'] = ASTAnalyzer()
+
+
+def _ast_worker(job: Tuple[str, List[str]]) -> Dict[str, Any]:
+    commit_hash, py_files = job
+    return _analyze_commit_files(_worker_state['blob_reader'], _worker_state['analyzer'], commit_hash, py_files)
+
+
 class CommitAnalyzer:
     def analyze(self, commits: List[Dict[str, Any]]) -> Dict[str, Any]:
         commits = commits or []
@@ -49,9 +202,14 @@ class CommitAnalyzer:
                 'ast_analysis_summary': {},
             }
 
+        # pandas 只在真正做统计时才导入：进程池 worker 与只用 git/AST 辅助函数的调用方不必承担其导入开销
+        import pandas as pd
+
         df = pd.DataFrame(commits)
+        # 只保留统计用到的列（输入里的 message/author_email 等不再跟着后续的 copy/groupby 走）
+        df = df[[col for col in _COMMIT_COLUMNS if col in df.columns]]
         if 'date' in df.columns:
-            df['date'] = pd.to_datetime(df['date'], errors='coerce', utc=True)
+            df['date'] = pd.to_datetime(df['date'], errors='coerce', utc=True, format='ISO8601')
 
         # normalize numeric stats (2.2 change size)
         for col in ['files_changed', 'insertions', 'deletions']:
@@ -66,11 +224,7 @@ class CommitAnalyzer:
             df['is_fix'] = False
         else:
             s = subject.fillna('').astype(str)
-            fix_re = re.compile(
-                r"(\bcve-\d{4}-\d+\b|\bsecurity\b|\bfix(?:e[ds])?\b|\bbug(?:s)?\b|\bdefect(?:s)?\b|\bregress(?:ion|ed)?\b|\bcrash(?:es|ed)?\b|\bhot\s*fix\b|\bpatch\b|\bresolve[sd]?\b|\bcloses?\b)",
-                re.IGNORECASE,
-            )
-            df['is_fix'] = s.map(lambda x: bool(fix_re.search(x)))
+            df['is_fix'] = s.str.contains(_FIX_RE, na=False).astype(bool)
 
         total_commits = int(len(df))
         date_min = df['date'].min() if 'date' in df.columns else None
@@ -87,10 +241,14 @@ class CommitAnalyzer:
             authors_top = [{'author': a, 'count': int(n)} for a, n in c.value_counts().head(10).items()]
 
         # top files
-        files_counter: Counter[str] = Counter()
-        for files in df.get('files', []):
-            if isinstance(files, list):
-                files_counter.update([f for f in files if isinstance(f, str) and f])
+        # 一次 Counter 构造吃下整条生成器（计数在 C 层完成），不再为每个 commit 建临时列表再 update
+        files_counter: Counter[str] = Counter(
+            f
+            for files in df.get('files', [])
+            if isinstance(files, list)
+            for f in files
+            if isinstance(f, str) and f
+        )
         files_top = [{'file': f, 'count': int(n)} for f, n in files_counter.most_common(15)]
 
         # commits by month
@@ -98,54 +256,50 @@ class CommitAnalyzer:
         fix_commits_by_month = []
         change_size_by_month = []
         if 'date' in df.columns and df['date'].notna().any():
-            g = df.dropna(subset=['date']).copy()
-            g['month'] = g['date'].dt.to_period('M').astype(str)
-            bym = g.groupby('month').size().reset_index(name='count').sort_values('month')
-            commits_by_month = bym.to_dict(orient='records')
-
-            # fix ratio by month
-            fm = g.groupby('month').agg(
+            # 按月聚合只需要数值列：去掉 files（每行一个 list）和文本列后再复制
+            g = df.drop(columns=['files', 'subject', 'author_name'], errors='ignore').dropna(subset=['date']).copy()
+            # 直接按 Period 分组（整数编码），只把聚合后的几十个月份转成字符串
+            g['month'] = g['date'].dt.to_period('M')
+            # 一次 groupby 算出三组按月序列所需的全部聚合列（groupby 默认按 month 排序）
+            bm = g.groupby('month').agg(
                 total_count=('hash', 'size'),
                 fix_count=('is_fix', 'sum'),
-            ).reset_index()
-            fm['ratio'] = fm.apply(
-                lambda r: float(r['fix_count'] / r['total_count']) if int(r['total_count']) else 0.0,
-                axis=1,
-            )
-            fm = fm.sort_values('month')
-            fix_commits_by_month = [
-                {
-                    'month': row['month'],
-                    'total_count': int(row['total_count']),
-                    'fix_count': int(row['fix_count']),
-                    'ratio': float(row['ratio']),
-                }
-                for _, row in fm.iterrows()
-            ]
-
-            # change size by month
-            cm = g.groupby('month').agg(
-                commits=('hash', 'size'),
                 files_changed=('files_changed', 'sum'),
                 insertions=('insertions', 'sum'),
                 deletions=('deletions', 'sum'),
                 change_size_mean=('change_size', 'mean'),
                 change_size_median=('change_size', 'median'),
+                # p90 保留逐月 Series.quantile：分组 quantile 的插值舍入不同，末位会与既有结果不一致
                 change_size_p90=('change_size', lambda x: float(x.quantile(0.9)) if len(x) else 0.0),
-            ).reset_index().sort_values('month')
-            change_size_by_month = [
-                {
-                    'month': row['month'],
-                    'commits': int(row['commits']),
-                    'files_changed': int(row['files_changed']),
-                    'insertions': int(row['insertions']),
-                    'deletions': int(row['deletions']),
-                    'change_size_mean': float(row['change_size_mean']) if row['change_size_mean'] == row['change_size_mean'] else 0.0,
-                    'change_size_median': float(row['change_size_median']) if row['change_size_median'] == row['change_size_median'] else 0.0,
-                    'change_size_p90': float(row['change_size_p90']) if row['change_size_p90'] == row['change_size_p90'] else 0.0,
-                }
-                for _, row in cm.iterrows()
-            ]
+            ).reset_index()
+            bm['month'] = bm['month'].astype(str)
+
+            commits_by_month = bm[['month', 'total_count']].rename(columns={'total_count': 'count'}).to_dict(orient='records')
+
+            # fix ratio by month
+            fm = bm[['month', 'total_count', 'fix_count']].copy()
+            # 整列相除；total_count 为 0 的月份比例记为 0
+            total = fm['total_count']
+            fm['ratio'] = (fm['fix_count'] / total.where(total != 0)).fillna(0.0)
+            # 先整列定好 dtype，再由 to_dict 一次性转成原生 int/float 的记录列表
+            fix_commits_by_month = fm.astype(
+                {'total_count': 'int64', 'fix_count': 'int64', 'ratio': 'float64'}
+            ).to_dict(orient='records')
+
+            # change size by month
+            cm = bm.drop(columns=['fix_count']).rename(columns={'total_count': 'commits'})
+            stat_cols = ['change_size_mean', 'change_size_median', 'change_size_p90']
+            cm[stat_cols] = cm[stat_cols].fillna(0.0)
+            cm_dtypes = {
+                'commits': 'int64',
+                'files_changed': 'int64',
+                'insertions': 'int64',
+                'deletions': 'int64',
+                'change_size_mean': 'float64',
+                'change_size_median': 'float64',
+                'change_size_p90': 'float64',
+            }
+            change_size_by_month = cm[['month', *cm_dtypes]].astype(cm_dtypes).to_dict(orient='records')
 
         change_size_stats = {
             'files_changed_total': int(df['files_changed'].sum()),
@@ -183,6 +337,8 @@ class CommitAnalyzer:
         - 用 ASTAnalyzer.analyze(code, file_path) 提取危险模式与基础指标。
         - 聚合到 month 粒度，输出趋势与 top patterns。
         """
+        import numpy as np
+        import pandas as pd
 
         if not ASTAnalyzer:
             return {
@@ -211,50 +367,16 @@ class CommitAnalyzer:
         max_files_per_commit = int(os.getenv('PILLOW_AST_MAX_FILES_PER_COMMIT', '30') or '30')
         sample_strategy = (os.getenv('PILLOW_AST_SAMPLE_STRATEGY', 'recent') or 'recent').strip().lower()
 
-        fix_re = re.compile(
-            r"(\bcve-\d{4}-\d+\b|\bsecurity\b|\bfix(?:e[ds])?\b|\bbug(?:s)?\b|\bdefect(?:s)?\b|\bregress(?:ion|ed)?\b|\bcrash(?:es|ed)?\b|\bhot\s*fix\b|\bpatch\b|\bresolve[sd]?\b|\bcloses?\b)",
-            re.IGNORECASE,
-        )
-
         def _git(args: List[str]) -> Tuple[int, str, str]:
-            try:
-                p = subprocess.run(
-                    ['git', *args],
-                    cwd=repo_path,
-                    text=True,
-                    encoding='utf-8',
-                    errors='replace',
-                    capture_output=True,
-                )
-                return int(p.returncode), p.stdout or '', p.stderr or ''
-            except FileNotFoundError:
-                return 127, '', 'git_not_found'
+            return _run_git(repo_path, args)
 
         def _get_files_for_commit(commit_hash: str) -> List[str]:
             # Prefer files list from processed JSON; fallback to git show --name-only
-            rc, out, _ = _git(['show', '--name-only', '--pretty=format:', commit_hash])
+            # -z：路径以 NUL 分隔且不做引号转义（含空格/非 ASCII 的路径原样返回），无需逐行 strip
+            rc, out, _ = _git(['show', '--name-only', '-z', '--pretty=format:', commit_hash])
             if rc != 0:
                 return []
-            paths = [line.strip() for line in (out.splitlines() if out else []) if line.strip()]
-            return paths
-
-        def _get_file_at_commit(commit_hash: str, path: str) -> Optional[str]:
-            rc, out, _ = _git(['show', f'{commit_hash}:{path}'])
-            if rc != 0:
-                return None
-            return out
-
-        def _is_python_file(path: str) -> bool:
-            p = (path or '').replace('\\', '/')
-            if not p.lower().endswith('.py'):
-                return False
-            # Speed: skip tests/docs/vendor-like paths by default
-            lowered = p.lower()
-            if lowered.startswith('tests/') or lowered.startswith('docs/') or '/tests/' in lowered or '/docs/' in lowered:
-                return False
-            return True
-
-        analyzer = ASTAnalyzer()
+            return [p for p in out.split('\0') if p]
 
         # Preflight: ensure git is available
         rc, _, err = _git(['--version'])
@@ -278,37 +400,36 @@ class CommitAnalyzer:
         skipped_no_python_files = 0
 
         pattern_counts: Counter[str] = Counter()
-        pattern_counts_by_month: Dict[str, Counter[str]] = {}
-        month_totals: Dict[str, Dict[str, int]] = {}
+        pattern_counts_by_month: Dict[str, Counter[str]] = defaultdict(Counter)
+        # month -> [commits, commits_with_patterns, patterns_total]，按固定下标累加
+        month_totals: Dict[str, List[int]] = defaultdict(lambda: [0, 0, 0])
 
         def _take_evenly(items: List[Any], k: int) -> List[Any]:
             if k <= 0 or not items:
                 return []
             if len(items) <= k:
                 return list(items)
+            if k == 1:
+                # 只取一个时与 linspace 一致取首个（否则下面的 k - 1 为 0）
+                return [items[0]]
             # deterministic even spacing across list
-            idxs = [int(round(i * (len(items) - 1) / (k - 1))) for i in range(k)]
-            seen = set()
-            out: List[Any] = []
-            for idx in idxs:
-                if idx not in seen:
-                    out.append(items[idx])
-                    seen.add(idx)
-            return out
+            # 与逐个 round(i * (n - 1) / (k - 1)) 相同的运算顺序（先整数乘再除、四舍六入五成双），下标完全一致
+            idxs = np.unique(np.rint(np.arange(k) * (len(items) - 1) / (k - 1)).astype(np.int64))
+            return [items[i] for i in idxs]
 
         # Candidate commits: subject matches fix/security keywords
-        candidates: List[Dict[str, Any]] = []
-        for c in (commits or []):
-            if not isinstance(c, dict):
-                continue
-            subject = (c.get('subject') or '')
-            if isinstance(subject, str) and fix_re.search(subject):
-                candidates.append(c)
+        dict_commits = [c for c in (commits or []) if isinstance(c, dict)]
+        subjects = pd.Series(
+            [c.get('subject') if isinstance(c.get('subject'), str) else '' for c in dict_commits],
+            dtype=object,
+        )
+        is_candidate = subjects.str.contains(_FIX_RE, na=False).tolist() if dict_commits else []
+        candidates: List[Dict[str, Any]] = [c for c, hit in zip(dict_commits, is_candidate) if hit]
 
         # Prepare candidates with parsed datetime/month for sampling
         enriched: List[Tuple[pd.Timestamp, str, Dict[str, Any]]] = []
         for c in candidates:
-            dt = pd.to_datetime(c.get('date'), errors='coerce', utc=True)
+            dt = pd.to_datetime(c.get('date'), errors='coerce', utc=True, format='ISO8601')
             if pd.isna(dt):
                 continue
             month = dt.to_period('M').strftime('%Y-%m')
@@ -333,24 +454,25 @@ class CommitAnalyzer:
         candidates_total = len(enriched)
 
         # Select commits according to sampling strategy
-        selected: List[Dict[str, Any]] = []
+        # selected 直接沿用 enriched 的 (datetime, month, commit) 三元组，后面不再重复解析日期
+        selected: List[Tuple[pd.Timestamp, str, Dict[str, Any]]] = []
         if sample_strategy in {'recent', 'latest', 'head'}:
             enriched_sorted = sorted(enriched, key=lambda x: x[0], reverse=True)
-            selected = [c for _, _, c in enriched_sorted[:max_commits]]
+            selected = enriched_sorted[:max_commits]
             sample_strategy = 'recent'
         elif sample_strategy in {'chronological', 'oldest', 'asc'}:
             enriched_sorted = sorted(enriched, key=lambda x: x[0])
-            selected = [c for _, _, c in enriched_sorted[:max_commits]]
+            selected = enriched_sorted[:max_commits]
             sample_strategy = 'chronological'
         elif sample_strategy in {'uniform_by_month', 'stratified_by_month', 'month'}:
             # stable, spread across time
             enriched_sorted = sorted(enriched, key=lambda x: x[0])
-            month_groups: Dict[str, List[Dict[str, Any]]] = {}
-            for _, m, c in enriched_sorted:
-                month_groups.setdefault(m, []).append(c)
+            month_groups: Dict[str, List[Tuple[pd.Timestamp, str, Dict[str, Any]]]] = {}
+            for item in enriched_sorted:
+                month_groups.setdefault(item[1], []).append(item)
             months_sorted = sorted(month_groups.keys())
             per_month = max(1, int(math.ceil(max_commits / max(1, len(months_sorted)))))
-            tmp: List[Dict[str, Any]] = []
+            tmp: List[Tuple[pd.Timestamp, str, Dict[str, Any]]] = []
             for m in months_sorted:
                 tmp.extend(_take_evenly(month_groups[m], per_month))
             selected = _take_evenly(tmp, max_commits)
@@ -358,21 +480,18 @@ class CommitAnalyzer:
         else:
             # fallback: keep old behavior but make it deterministic (recent)
             enriched_sorted = sorted(enriched, key=lambda x: x[0], reverse=True)
-            selected = [c for _, _, c in enriched_sorted[:max_commits]]
+            selected = enriched_sorted[:max_commits]
             sample_strategy = 'recent'
 
-        for commit in selected:
+        # 先串行筛出要分析的 commit（只做轻量的路径/日期处理），再统一读取 + 解析
+        jobs: List[Tuple[str, str, List[str]]] = []
+        for _, month, commit in selected:
             selected_commits += 1
             commit_hash = commit.get('hash') or ''
             if not commit_hash:
                 skipped_missing_hash += 1
                 continue
 
-            dt = pd.to_datetime(commit.get('date'), errors='coerce', utc=True)
-            if pd.isna(dt):
-                continue
-            month = dt.to_period('M').strftime('%Y-%m')
-
             files = commit.get('files') if isinstance(commit.get('files'), list) else None
             file_paths = [f for f in (files or []) if isinstance(f, str) and f]
             if not file_paths:
@@ -386,53 +505,64 @@ class CommitAnalyzer:
             if not py_files:
                 skipped_no_python_files += 1
                 continue
-            py_files = py_files[:max_files_per_commit]
-
+            jobs.append((month, commit_hash, py_files[:max_files_per_commit]))
+
+        # 各 commit 相互独立：数量够多时交给进程池（ast.parse 是 CPU 密集，线程受 GIL 限制），
+        # 每个 worker 自带一个 git cat-file 进程；commit 太少时进程启动开销不划算，直接串行。
+        # PILLOW_AST_WORKERS=1 可强制串行。
+        workers = int(os.getenv('PILLOW_AST_WORKERS', '0') or '0') or min(8, os.cpu_count() or 1)
+        work = [(commit_hash, py_files) for _, commit_hash, py_files in jobs]
+        commit_results: Optional[List[Dict[str, Any]]] = None
+        if workers > 1 and len(work) >= 8:
+            try:
+                with ProcessPoolExecutor(
+                    max_workers=min(workers, len(work)),
+                    initializer=_init_ast_worker,
+                    initargs=(repo_path,),
+                ) as ex:
+                    chunksize = max(1, len(work) // (workers * 4))
+                    commit_results = list(ex.map(_ast_worker, work, chunksize=chunksize))
+            except (OSError, BrokenProcessPool) as e:
+                print('[commit_analyzer][WARN] process pool unavailable, analyzing serially:', e)
+        if commit_results is None:
+            # 一个常驻 git cat-file --batch 进程供所有 commit 取文件内容，替代每个文件一次 git show
+            analyzer = ASTAnalyzer()
+            with _GitBlobReader(repo_path) as blob_reader:
+                commit_results = [
+                    _analyze_commit_files(blob_reader, analyzer, commit_hash, py_files)
+                    for commit_hash, py_files in work
+                ]
+
+        # 按 selected 的顺序合并，计数（含 Counter 的并列顺序）与串行逐个处理时一致
+        for (month, _, _), res in zip(jobs, commit_results):
             analyzed_commits += 1
-            month_bucket = month_totals.setdefault(month, {'commits': 0, 'commits_with_patterns': 0, 'patterns_total': 0})
-            month_bucket['commits'] += 1
-            month_counter = pattern_counts_by_month.setdefault(month, Counter())
-
-            commit_patterns = 0
-            for path in py_files:
-                code = _get_file_at_commit(commit_hash, path)
-                if code is None:
-                    errors_total += 1
-                    continue
-
-                analyzed_files += 1
-                r = analyzer.analyze(code, file_path=path)
-                if r.get('error'):
-                    errors_total += 1
-                    continue
-
-                pts = r.get('patterns_found') or []
-                if pts:
-                    commit_patterns += len(pts)
-                    pattern_counts.update(pts)
-                    month_counter.update(pts)
-
-                patterns_total += int(r.get('security_issues_potential') or 0)
-                complexity_total += int(r.get('complexity_score') or 0)
-                function_count_total += int(r.get('function_count') or 0)
-
-            if commit_patterns > 0:
+            month_bucket = month_totals[month]
+            month_bucket[0] += 1
+
+            analyzed_files += res['files']
+            errors_total += res['errors']
+            patterns_total += res['patterns_total']
+            complexity_total += res['complexity']
+            function_count_total += res['functions']
+
+            pts = res['patterns']
+            if pts:
+                pattern_counts.update(pts)
+                pattern_counts_by_month[month].update(pts)
                 commits_with_patterns += 1
-                month_bucket['commits_with_patterns'] += 1
-                month_bucket['patterns_total'] += commit_patterns
+                month_bucket[1] += 1
+                month_bucket[2] += len(pts)
 
         # Build month series
-        months_sorted = sorted(month_totals.keys())
+        months_sorted = sorted(month_totals)
         patterns_by_month = []
         for m in months_sorted:
-            b = month_totals[m]
-            commits_n = int(b.get('commits') or 0)
-            patterns_n = int(b.get('patterns_total') or 0)
+            commits_n, with_patterns_n, patterns_n = month_totals[m]
             patterns_by_month.append(
                 {
                     'month': m,
                     'commits_analyzed': commits_n,
-                    'commits_with_patterns': int(b.get('commits_with_patterns') or 0),
+                    'commits_with_patterns': with_patterns_n,
                     'patterns_total': patterns_n,
                     'patterns_per_commit': float(patterns_n / commits_n) if commits_n else 0.0,
                 }
@@ -13,6 +13,7 @@ from __future__ import annotations
 
 from typing import Any, Dict, List, Optional
 
+import numpy as np
 import pandas as pd
 
 
@@ -36,54 +37,37 @@ class IssueAnalyzer:
             }
 
         df = pd.DataFrame(issues)
-        df['created_dt'] = pd.to_datetime(df.get('created_at'), errors='coerce', utc=True)
-        df['closed_dt'] = pd.to_datetime(df.get('closed_at'), errors='coerce', utc=True)
+        df['created_dt'] = pd.to_datetime(df.get('created_at'), errors='coerce', utc=True, format='ISO8601')
+        df['closed_dt'] = pd.to_datetime(df.get('closed_at'), errors='coerce', utc=True, format='ISO8601')
         df['state'] = df.get('state', '').fillna('').astype(str)
 
         total = int(len(df))
         open_issues = int((df['state'] == 'open').sum())
         closed_issues = int((df['state'] == 'closed').sum())
 
-        created_by_month = []
-        closed_by_month = []
-        backlog_by_month = []
-
-        if df['created_dt'].notna().any():
-            c = df.dropna(subset=['created_dt']).copy()
-            c['month'] = c['created_dt'].dt.to_period('M').astype(str)
-            created = c.groupby('month').size().reset_index(name='count').sort_values('month')
-            created_by_month = created.to_dict(orient='records')
-
-        if df['closed_dt'].notna().any():
-            d = df.dropna(subset=['closed_dt']).copy()
-            d['month'] = d['closed_dt'].dt.to_period('M').astype(str)
-            closed = d.groupby('month').size().reset_index(name='count').sort_values('month')
-            closed_by_month = closed.to_dict(orient='records')
+        # 按月计数：直接在 Period 上 value_counts，输出时再转字符串
+        created_counts = df['created_dt'].dropna().dt.to_period('M').value_counts().sort_index()
+        closed_counts = df['closed_dt'].dropna().dt.to_period('M').value_counts().sort_index()
+        created_by_month = [{'month': str(p), 'count': int(n)} for p, n in created_counts.items()]
+        closed_by_month = [{'month': str(p), 'count': int(n)} for p, n in closed_counts.items()]
 
         # backlog by month: cumulative created - cumulative closed
-        if created_by_month:
-            created_series = pd.DataFrame(created_by_month).set_index('month')['count']
-            closed_series = pd.Series(dtype='int64')
-            if closed_by_month:
-                closed_series = pd.DataFrame(closed_by_month).set_index('month')['count']
-
-            # align months
-            all_months = sorted(set(created_series.index.tolist()) | set(closed_series.index.tolist()))
-            created_aligned = created_series.reindex(all_months, fill_value=0).cumsum()
-            closed_aligned = closed_series.reindex(all_months, fill_value=0).cumsum()
-            backlog = (created_aligned - closed_aligned).astype(int)
-            backlog_by_month = [{'month': m, 'count': int(backlog.loc[m])} for m in all_months]
+        backlog_by_month = []
+        if len(created_counts):
+            # align months（两侧均按月有序，outer join 即有序并集）
+            created_aligned, closed_aligned = created_counts.align(closed_counts, join='outer', fill_value=0)
+            backlog = (created_aligned.cumsum() - closed_aligned.cumsum()).astype('int64')
+            backlog_by_month = [{'month': str(p), 'count': int(n)} for p, n in backlog.items()]
 
-        # time to close stats
-        ttl = df.dropna(subset=['created_dt', 'closed_dt']).copy()
-        ttl['ttc_days'] = (ttl['closed_dt'] - ttl['created_dt']).dt.total_seconds() / 86400.0
-        ttl = ttl[ttl['ttc_days'].notna()]
+        # time to close stats：直接在 float64 数组上规约（NaT 相减得 NaN）
+        ttc = ((df['closed_dt'] - df['created_dt']).dt.total_seconds() / 86400.0).to_numpy(dtype='float64')
+        ttc = ttc[~np.isnan(ttc)]
 
         stats = {
-            'n': int(len(ttl)),
-            'median': float(ttl['ttc_days'].median()) if len(ttl) else None,
-            'p90': float(ttl['ttc_days'].quantile(0.9)) if len(ttl) else None,
-            'mean': float(ttl['ttc_days'].mean()) if len(ttl) else None,
+            'n': int(ttc.size),
+            'median': float(np.median(ttc)) if ttc.size else None,
+            'p90': float(np.percentile(ttc, 90)) if ttc.size else None,
+            'mean': float(np.mean(ttc)) if ttc.size else None,
         }
 
         return {